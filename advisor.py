@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conseiller Blackjack (NumPy) :
+- simule des millions de mains du croupier par lots vectorisés
+  (mêmes règles que engine.Hand : l'as vaut 11 puis 1, le croupier
+  tire jusqu'à 17 et reste sur tout 17),
+- en déduit une table d'espérance Hit / Stand indexée par total du
+  joueur, main souple/dure et carte visible du croupier,
+- table mise en cache disque, recalculée si les paramètres changent.
+Les cartes sont tirées avec remise (sabot infini), approximation
+suffisante pour un conseil face au sabot de 6 jeux du moteur.
+`python advisor.py` affiche le débit (mains/s) et la table.
+"""
+import os
+import sys
+import time
+import numpy as np
+
+from media import CACHE_DIR
+from engine import card_points
+
+ADVISOR_HANDS   = 2_000_000   # mains de croupier simulées par carte visible
+ADVISOR_BATCH   = 250_000
+ADVISOR_VERSION = 1
+ADVISOR_FILE    = os.path.join(CACHE_DIR, "advisor.npz")
+
+# 2..9, 10 (10/J/Q/K), 11 (as)
+CARD_PROBS = np.array([1,1,1,1,1,1,1,1,4,1], dtype=np.float64) / 13
+CARD_VALS  = np.arange(2, 12)
+UPCARDS    = range(2, 12)
+
+
+def simulate_dealer(upcard, n, rng, batch=ADVISOR_BATCH):
+    """
+    Distribution finale du croupier partant de `upcard` :
+    tableau de 6 probabilités [17, 18, 19, 20, 21, bust].
+    """
+    counts = np.zeros(6, dtype=np.int64)
+    done = 0
+    while done < n:
+        m = min(batch, n - done)
+        tot  = np.full(m, upcard, dtype=np.int16)
+        aces = np.full(m, int(upcard == 11), dtype=np.int16)
+        live = np.ones(m, dtype=bool)
+        while live.any():
+            idx  = np.flatnonzero(live)
+            card = CARD_VALS[rng.choice(10, size=idx.size, p=CARD_PROBS)]
+            t = tot[idx] + card
+            a = aces[idx] + (card == 11)
+            # as 11 → 1 tant que le total dépasse 21
+            soft_fix = (t > 21) & (a > 0)
+            t -= 10 * soft_fix
+            a -= soft_fix
+            tot[idx], aces[idx] = t, a
+            live[idx] = t < 17
+        bust = tot > 21
+        counts[:5] += np.bincount(tot[~bust] - 17, minlength=5)[:5]
+        counts[5]  += bust.sum()
+        done += m
+    return counts / n
+
+
+def build_table(hands=ADVISOR_HANDS, seed=0):
+    """
+    Renvoie (stand, hit) : tableaux [souple 0/1, total 0..21, visible 0..11]
+    d'espérance de gain pour une mise de 1 (gagné +1, égalité 0, perdu -1).
+    """
+    rng = np.random.default_rng(seed)
+    stand = np.zeros((2, 22, 12))
+    hit   = np.zeros((2, 22, 12))
+    for up in UPCARDS:
+        dist = simulate_dealer(up, hands, rng)
+        finals = np.arange(17, 22)
+        for t in range(4, 22):
+            win  = dist[5] + dist[:5][finals < t].sum()
+            lose = dist[:5][finals > t].sum()
+            stand[:, t, up] = win - lose
+        best = stand[:, :, up].copy()
+
+        def hard_ev(t):
+            ev = 0.0
+            for v, p in zip(CARD_VALS, CARD_PROBS):
+                if v == 11 and t + 11 <= 21:
+                    ev += p * best[1, t + 11]   # l'as compte 11 : main souple
+                else:
+                    nt = t + (1 if v == 11 else v)
+                    ev += p * (best[0, nt] if nt <= 21 else -1.0)
+            return ev
+
+        def soft_ev(t):
+            ev = 0.0
+            for v, p in zip(CARD_VALS, CARD_PROBS):
+                nt = t + (1 if v == 11 else v)
+                # au-delà de 21 l'as redevient 1 : main dure
+                ev += p * (best[1, nt] if nt <= 21 else best[0, nt - 10])
+            return ev
+
+        # ordre de calcul : chaque état ne dépend que d'états déjà connus
+        # (dur >= 11 → dur plus haut, souple → dur >= 12, dur <= 10 → tout)
+        for soft, totals, fn in ((0, range(21, 10, -1), hard_ev),
+                                 (1, range(21, 11, -1), soft_ev),
+                                 (0, range(10, 3, -1),  hard_ev)):
+            for t in totals:
+                hit[soft, t, up] = fn(t)
+                best[soft, t]    = max(stand[soft, t, up], hit[soft, t, up])
+    return stand, hit
+
+
+def load_table(path=ADVISOR_FILE, hands=ADVISOR_HANDS):
+    """ Table depuis le cache disque, calculée puis écrite si absente. """
+    try:
+        data = np.load(path)
+        if (int(data["version"]) == ADVISOR_VERSION
+                and int(data["hands"]) == hands):
+            return data["stand"], data["hit"]
+    except (OSError, KeyError, ValueError):
+        pass
+    stand, hit = build_table(hands)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, stand=stand, hit=hit,
+                 version=ADVISOR_VERSION, hands=hands)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[Warning] Table du conseiller non écrite : {e}")
+    return stand, hit
+
+
+class Advisor:
+    """ Conseil pour une main en cours : advise(joueur, croupier). """
+
+    def __init__(self, table):
+        self.stand, self.hit = table
+
+    def advise(self, player, dealer):
+        """
+        (action, ev_hit, ev_stand) pour deux engine.Hand, action "Hit"
+        ou "Stand" ; la carte visible est la première du croupier.
+        """
+        tot, soft = player.total, player.soft
+        up = card_points(dealer.cards[0])
+        if tot > 21:
+            return "Stand", -1.0, -1.0
+        eh = self.hit[int(soft), tot, up]
+        es = self.stand[int(soft), tot, up]
+        return ("Hit" if eh > es else "Stand"), eh, es
+
+
+def benchmark(hands=ADVISOR_HANDS):
+    rng = np.random.default_rng(1)
+    t0 = time.perf_counter()
+    simulate_dealer(10, hands, rng)
+    dt = time.perf_counter() - t0
+    print(f"{hands:,} mains croupier en {dt:.2f}s ({hands/dt:,.0f} mains/s)")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else ADVISOR_HANDS
+    benchmark(n)
+    stand, hit = build_table(n // 10)
+    print("dur  " + " ".join(f"{u:>3}" for u in UPCARDS))
+    for t in range(4, 22):
+        row = " ".join(" H " if hit[0, t, u] > stand[0, t, u] else " S "
+                       for u in UPCARDS)
+        print(f"{t:>4} {row}")
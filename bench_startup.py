@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banc de démarrage de l'overlay :
+- lance `compteur.py --bench-startup` dans des process neufs,
+- relève le temps jusqu'à la première peinture du compteur et jusqu'à
+  la fin du chargement différé (vidéo, course, Blackjack),
+- dossier de cache/état temporaire : le premier lancement est à froid
+  (vignette de la table à calculer), les suivants relisent le cache.
+`python bench_startup.py [lancements]`
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+RUNS = 5
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once(env):
+    """ (process_ms, paint_ms, assets_ms) pour un lancement. """
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, os.path.join(HERE, "compteur.py"), "--bench-startup"],
+        env=env, capture_output=True, text=True, timeout=60)
+    wall = (time.perf_counter() - t0) * 1000
+    for line in out.stdout.splitlines():
+        if line.startswith("startup "):
+            vals = dict(kv.split("=") for kv in line.split()[1:])
+            return wall, float(vals["paint_ms"]), float(vals["assets_ms"])
+    raise RuntimeError(f"pas de mesure (code {out.returncode}) :\n{out.stderr}")
+
+
+def main(runs=RUNS):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, LOCALAPPDATA=tmp)
+        results = [run_once(env) for _ in range(runs)]
+    for i, (wall, paint, assets) in enumerate(results):
+        tag = "froid" if i == 0 else "cache"
+        print(f"#{i+1} {tag:<5}  compteur {paint:6.1f} ms  "
+              f"chargé {assets:6.1f} ms  process {wall:6.1f} ms")
+    warm = results[1:] or results
+    print(f"médiane (cache) : compteur "
+          f"{statistics.median(r[1] for r in warm):.1f} ms, chargé "
+          f"{statistics.median(r[2] for r in warm):.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS)
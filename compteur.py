@@ -2,34 +2,93 @@
 # -*- coding: utf-8 -*-
 """
 Overlay Windows simulant un compteur de taxi design pour :
-- afficher en direct votre salaire qui défile,
+- afficher en direct votre salaire qui défile (postes, pauses, nuit et
+  heures sup. de shifts.json, table de paie interrogée par bisect sur
+  une horloge monotone),
 - afficher toutes les 30 s un message d'encouragement,
 - déplacer la fenêtre (clic gauche sur compteur, clic droit sur cookie),
 - carré 🍪 comptant les clics (peut être négatif, cache la vidéo si < –100),
-- mini-calculatrice Pythagore à côté du cookie,
+- mini-calculatrice Pythagore à côté du cookie ; bouton « Lot… » :
+  normes de vecteurs collés ou d'un CSV (NumPy, CSV lu par blocs sur
+  un thread, résultats récents en cache, pythagore.py),
 - bouton 🛒 ouvrant la boutique d’auto-clics dans une nouvelle fenêtre,
 - inventaire affichant vos emojis achetés,
-- course de chevaux intégrée à droite de la vidéo (pari & animation),
-- vidéo YouTube en boucle sous le compteur,
+- course de chevaux intégrée à droite de la vidéo (pari & animation,
+  course tirée d'avance depuis une graine, cotes équitables simulées),
+- vidéo YouTube en boucle sous le compteur (flux résolus en arrière-plan,
+  au plus petit format couvrant le cadre, téléchargés une fois dans un
+  cache local LRU puis lus hors ligne),
 - son de fond continu (vidéo dJs04lHumSA),
-- vidéo spéciale toutes les 10 minutes en plein écran au centre,
+- vidéo spéciale toutes les 10 minutes en plein écran au centre
+  (préchargée en pause une minute avant pour démarrer sans délai),
+- partie (cookies, auto-clics, début de journée) sauvegardée et reprise
+  au redémarrage, revenu des auto-clics crédité pour le temps d'arrêt,
 - mini-jeu de Blackjack SOUS la vidéo avec table de pari,
-  boutons Hit/Stand/New Game et mise de cookies.
+  boutons Hit/Stand/New Game et mise de cookies, conseil Hit/Stand
+  tiré d'une table d'espérance Monte Carlo (advisor.py, NumPy),
+- logique de jeu (cookies, blackjack, course) dans engine.py, jouable
+  sans affichage ; cette fenêtre n'en est que la vue.
+- actions enregistrées avec la graine de la session (replay.py pour
+  rejouer une journée sans affichage et vérifier l'état final),
+- historique des mains, courses et achats dans SQLite (statsdb.py,
+  écrit par un thread dédié) ; double-clic sur le compteur : taux de
+  victoire, cookies nets par heure et salaire par jour,
+- métriques locales optionnelles (COMPTEUR_METRICS, metrics.py) :
+  /metrics Prometheus et /metrics.json servis par un thread asyncio à
+  partir d'un instantané publié à chaque tick du salaire,
+- textes rafraîchis via view.ViewModel : Tk n'est appelé que si le
+  texte affiché change (commandes Tk/s dans le panneau F12),
+- mode éco après une minute sans saisie ou fenêtre masquée : salaire
+  à 1 Hz, vidéo, son, course et sondages (flux, SQLite) en pause,
+  reprise à la première saisie (temps CPU par mode dans le panneau F12,
+  et à la fermeture avec COMPTEUR_DEBUG),
+- interface terminal sans Tk (`python compteur.py --tui`, tui.py) :
+  mêmes moteur, sauvegarde et historique, redessin incrémental,
+- mode tableau d'équipe (`python compteur.py --team employes.csv`) :
+  total du service et top N dans le style du compteur, gains de tous
+  les employés calculés d'un coup par NumPy (team.py),
+- démarrage rapide : compteur peint d'abord, vidéo, course et table
+  chargées juste après ; vlc, yt_dlp, PIL et NumPy importés seulement
+  par les fonctions qui s'en servent, table redimensionnée gardée en
+  cache (`python bench_startup.py` mesure le temps jusqu'au compteur),
 PRÉREQUIS :
 - Installer VLC (https://www.videolan.org/) pour libvlc.dll
-- pip install python-vlc yt_dlp pillow
+- pip install python-vlc yt_dlp pillow numpy
 """
+import time
+STARTUP_T0 = time.perf_counter()   # référence du banc de démarrage
+
 import os
 import sys
-import time
+import math
 import random
-import tkinter as tk
-from tkinter import font as tkfont
-from PIL import Image, ImageTk
+import threading
+import importlib.util
+try:
+    import tkinter as tk
+    from tkinter import font as tkfont
+except ImportError:   # hôte sans Tk : seule l'interface --tui est utilisable
+    tk = tkfont = None
+
+from media import (StreamResolver, PlayerPool, MediaCache, LocalSource,
+                   image_size, thumbnail)
+from scheduler import Scheduler
+from engine import GameState
+from persistence import Store, FLUSH_MS, SNAPSHOT_MS
+from replay import Recorder
+from profiler import PROFILE, EXPORT_MS, Profiler
+from power import PowerMonitor, POWER_POLL_MS, ECO
+from view import ViewModel
+from payroll import PaySchedule, WallClock, load_shifts
+from statsdb import StatsDB, summary, format_summary
+from pythagore import batch, csv_norms, default_out, format_batch, format_csv
 
 # URL de la vidéo spéciale et intervalle (10 min)
 SPECIAL_VIDEO_URL        = "https://www.youtube.com/watch?v=aaAZGJ6EpT4"
 SPECIAL_VIDEO_INTERVAL_MS = 10 * 60 * 1000
+SPECIAL_PREFETCH_MS       = 60 * 1000  # préchargement avant le créneau
+SPECIAL_BUFFER_TIMEOUT_MS = 45 * 1000  # sans MediaPlayerPaused : abandon
+SPECIAL_MAX_PLAY_MS       = 5 * 60 * 1000   # sans MediaPlayerEndReached
 
 # URL pour le son de fond
 AUDIO_BG_URL = "https://www.youtube.com/watch?v=dJs04lHumSA"
@@ -41,6 +100,7 @@ HORSE_SIZE  = 20
 
 # detection VLC + yt_dlp
 os_env = os.environ
+DEBUG = bool(os_env.get("COMPTEUR_DEBUG"))
 USE_VIDEO = False
 if sys.platform.startswith("win"):
     for p in (
@@ -54,20 +114,37 @@ if sys.platform.startswith("win"):
             if os.path.isdir(plug):
                 os_env["VLC_PLUGIN_PATH"] = plug
             break
-try:
-    import vlc
-    from yt_dlp import YoutubeDL
+# présence vérifiée sans importer : vlc et yt_dlp sont chargés par
+# media.PlayerPool / media.ytdlp_* une fois la fenêtre affichée
+def _installed(*mods):
+    return all(importlib.util.find_spec(m) is not None for m in mods)
+
+if _installed("vlc", "yt_dlp"):
     USE_VIDEO = True
-except ImportError:
+else:
     print("[Warning] Vidéo désactivée (python-vlc/yt_dlp manquant)")
 
+# conseiller Blackjack (table d'espérance Monte Carlo, NumPy), importé
+# dans son thread de chargement
+USE_ADVISOR = _installed("numpy")
+if not USE_ADVISOR:
+    print("[Warning] Conseiller Blackjack désactivé (numpy manquant)")
+
 # chemin table de pari Blackjack
 IMAGE_PATH = r"C:\Users\axoncare\Desktop\te\table.jpg"
 
 # CONFIG principale
 SALARY_PER_HOUR = 3000.00
 UPDATE_MS       = 100
+UPDATE_ECO_MS   = 1000    # salaire en mode éco (inactif / masqué)
+# suspendus en mode éco ("media" reste actif pendant la vidéo spéciale)
+ECO_PAUSED_GROUPS = ("horses", "media", "polls")
+FRAME_MS        = 16      # au plus un rafraîchissement du cookie par frame
 ENCOURAGE_MS    = 30000
+STATS_SALARY_MS = 60000   # salaire du jour enregistré dans stats.db
+STATS_REFRESH_MS = 5000   # fenêtre de statistiques ouverte
+CALC_POLL_MS    = 100     # progression d'un lot CSV de la calculatrice
+RESOLVE_POLL_MS = 50
 YT_URL          = "https://www.youtube.com/watch?v=L_fcrOyoWZ8"
 
 METER_W, METER_H = 400, 120
@@ -79,20 +156,35 @@ VIDEO_H          = 200
 FAIR_W           = 200
 BJ_SCALE         = 0.40
 
-# déterminer hauteur BJ
+# déterminer hauteur BJ (dimensions lues dans le cache des vignettes)
 try:
-    _img = Image.open(IMAGE_PATH)
-    scale_full = (METER_W + COOKIE_SIZE + CALC_W + SHOP_W + INV_W + FAIR_W) / _img.width
-    BJ_H = int(_img.height * scale_full)
-    TABLE_IMG = _img
-except:
+    _w, _h = image_size(IMAGE_PATH)
+    scale_full = (METER_W + COOKIE_SIZE + CALC_W + SHOP_W + INV_W + FAIR_W) / _w
+    BJ_H = int(_h * scale_full)
+    HAS_TABLE = True
+except (OSError, ImportError):
     BJ_H = 150
-    TABLE_IMG = None
+    HAS_TABLE = False
 
 TOTAL_W = METER_W + COOKIE_SIZE + CALC_W + SHOP_W + INV_W + FAIR_W
 TOTAL_H = METER_H + (VIDEO_H if USE_VIDEO else 0) + BJ_H
 X_OFF, Y_OFF = 50, 50
 
+# formats yt_dlp : le plus petit flux qui couvre le cadre d'affichage,
+# audio seul (débit modeste) pour le son de fond
+VIDEO_FORMAT   = f"worst[width>={METER_W}][height>={VIDEO_H}]/best"
+SPECIAL_FORMAT = f"worst[width>={TOTAL_W}][height>={TOTAL_H}]/best"
+AUDIO_FORMAT   = "bestaudio[abr<=128]/bestaudio"
+# dossier de médias locaux remplaçant YouTube (tests / hors ligne)
+LOCAL_MEDIA = os_env.get("COMPTEUR_LOCAL_MEDIA")
+# serveur de métriques : metrics.py (et asyncio) importé seulement si demandé
+METRICS = bool(os_env.get("COMPTEUR_METRICS"))
+# --bench-startup : affiche les temps de démarrage puis quitte
+BENCH_STARTUP = "--bench-startup" in sys.argv
+ASSETS_FALLBACK_MS = 500   # chargement différé même sans <Expose>
+
+TEAM_ROW_H = 24   # hauteur d'une ligne du top N (mode équipe)
+
 BG_COLOR    = "#333"
 ACCENT      = "#FFD700"
 TEXT_COLOR  = "#FFF"
@@ -116,38 +208,139 @@ def round_rect(c, x1, y1, x2, y2, r=20, **kw):
 
 class TaxiOverlay:
     def __init__(self):
-        # état
-        self.start       = time.time()
-        self.click_count = 0
-        self.current_bet = 0
-        self.upgrades    = [
-            {'emoji':'🍓','cost':10,'interval':5000,'amount':1,'count':0},
-            {'emoji':'🐌','cost':50,'interval':10000,'amount':5,'count':0},
-        ]
+        # état (cookies, blackjack, course) : moteur sans Tk, la fenêtre
+        # ne fait qu'afficher ses événements
+        self.game        = GameState(horse_finish=FAIR_W - 20 - HORSE_SIZE)
+        self.economy     = self.game.economy
+        # reprise de la partie sauvegardée (+ revenu gagné hors ligne)
+        self.store       = Store()
+        self.start       = self.store.restore(self.game, time.time())
+        # salaire : calendrier de paie compilé, horloge insensible aux
+        # changements d'heure système
+        self.pay         = PaySchedule(load_shifts(SALARY_PER_HOUR))
+        self.wall        = WallClock()
+        # actions enregistrées pour rejeu (replay.py), hasard seedé
+        self.recorder    = Recorder(self.game)
+        self.msg_rng     = random.Random(self.game.seed)
+        # historique SQLite, écrit hors du thread Tk
+        self.stats       = StatsDB()
+        self.stats.attach(self.game)
+        self.stats_window = None
+        self.batch_window = None
+        self._batch_done  = []   # résultat du lot CSV, déposé par le thread
+        self._batch_job   = None
+        # instantané publié à chaque tick pour le serveur de métriques
+        self.metrics     = None
+        if METRICS:
+            from metrics import MetricsServer
+            self.metrics = MetricsServer().start()
+        self._click_total = 0
+        self.upgrades    = self.economy.upgrades
+        self.economy.subscribe(self._on_economy)
         self.shop_window = None
+        self.shop_labels = {}   # index d'amélioration → label de la boutique
+        # dernières valeurs rendues : Tk n'est appelé que si elles changent
+        self.view        = ViewModel()
+        self.tk_rate     = (0.0, 0.0)
 
         # fenetre
         self.root      = tk.Tk()
         self.f_label   = tkfont.Font(family="Helvetica", size=12, weight="bold")
         self.f_salary  = tkfont.Font(family="Helvetica", size=32, weight="bold")
+        # toutes les tâches périodiques passent par cet ordonnanceur
+        self.prof      = Profiler() if PROFILE else None
+        self.sched     = Scheduler(self.root, profiler=self.prof)
+        # inactivité / fenêtre masquée → mode éco (_on_power)
+        self.power     = PowerMonitor()
+        self.power.subscribe(self._on_power)
 
         self._setup_window()
         self._create_top_row()
+        self._bind_drag()
+        self._bind_power()
+        self._salary_job = self.sched.every(UPDATE_MS, self._update_salary,
+                                            group="ui", delay_ms=0)
+        self.sched.every(ENCOURAGE_MS, self._schedule_enc, group="ui", delay_ms=0)
+        self._start_upgrades()
+        self.sched.every(FLUSH_MS, self.store.flush, group="persist")
+        self.sched.every(FLUSH_MS, self.recorder.flush, group="persist")
+        self.sched.every(SNAPSHOT_MS, self.store.snapshot, group="persist")
+        self.sched.every(UPDATE_MS, self.stats.poll, group="polls",
+                         name="_poll_stats")
+        self.sched.every(STATS_SALARY_MS, self._record_salary, group="persist")
+        if self.prof:
+            # export JSON périodique + panneau caché (F12)
+            self.sched.every(EXPORT_MS, self.prof.export, group="debug")
+            self.root.bind_all("<F12>", lambda _: self._toggle_debug_panel())
+        # compteur peint d'abord, le reste chargé juste après
+        self._assets_loaded = False
+        self.meter.bind("<Expose>", self._on_first_paint)
+        self.sched.once(ASSETS_FALLBACK_MS, self._load_assets, group="ui")
 
+        self.root.mainloop()
+        self._close_media()
+        if DEBUG:
+            print(f"[Debug] {self.power.report()}")
+        self._record_salary()
+        if self.metrics:
+            self.metrics.close()
+        self.stats.close()
+        self.store.close()
+        self.recorder.close()
+        if self.prof:
+            self.prof.export()
+
+    def _close_media(self):
+        # sans cela, la sortie attendrait la fin d'un téléchargement yt_dlp
+        if getattr(self, "resolver", None):
+            self.resolver.shutdown()
+        if getattr(self, "players", None):
+            for name in ("video_player", "audio_player", "special_player"):
+                player = getattr(self, name, None)
+                if player:
+                    self.players.release(player)
+                    setattr(self, name, None)
+            self.players.close()
+
+    def _on_first_paint(self, _e):
+        self.meter.unbind("<Expose>")
+        self.t_paint = time.perf_counter() - STARTUP_T0
+        # après les redessins en attente, donc après la peinture du compteur
+        self.root.after_idle(self._load_assets)
+
+    def _load_assets(self):
+        """ Vidéo, son, course et Blackjack, une fois le compteur affiché. """
+        if self._assets_loaded:
+            return
+        self._assets_loaded = True
+        self.players = None
         if USE_VIDEO:
+            try:
+                self.players = PlayerPool()   # une seule instance libvlc
+            except (ImportError, OSError) as e:
+                print(f"[Warning] Vidéo désactivée (libvlc : {e})")
+        if self.players:
+            # yt_dlp tourne dans des workers, résultats relevés par _poll_streams
+            if LOCAL_MEDIA:
+                src = LocalSource(LOCAL_MEDIA)
+                self.resolver = StreamResolver(
+                    extractor=src.extract,
+                    media_cache=MediaCache(downloader=src.download))
+            else:
+                self.resolver = StreamResolver(media_cache=MediaCache())
+            self._stream_job = None   # sondage actif seulement si attente
             self._create_video()
             self._play_video()
             self._play_audio_bg()       # démarre le son de fond
             self._create_horse_race()
-
+            self._schedule_special_video()
         self._create_blackjack()
-        self._bind_drag()
-        self._update_salary()
-        self._schedule_enc()
-        self._start_upgrades()
-        self._schedule_special_video()
-
-        self.root.mainloop()
+        if BENCH_STARTUP:
+            t_assets = time.perf_counter() - STARTUP_T0
+            t_paint  = getattr(self, "t_paint", t_assets)
+            print(f"startup paint_ms={t_paint*1000:.1f} "
+                  f"assets_ms={t_assets*1000:.1f}", flush=True)
+            self.root.after_idle(self.root.destroy)
 
     def _setup_window(self):
         self.root.overrideredirect(True)
@@ -178,7 +371,16 @@ class TaxiOverlay:
                                      fill=ACCENT,outline=ACCENT)
         self.cookie_text = self.cookie.create_text(
             COOKIE_SIZE/2,COOKIE_SIZE/2,
-            text=f"🍪 {self.click_count}",fill=BG_COLOR,font=self.f_label)
+            text=f"🍪 {self.economy.cookies}",fill=BG_COLOR,font=self.f_label)
+        # compteur d'entrée : clics/s et frames perdues (flush en retard)
+        self.cookie_stats = self.cookie.create_text(
+            COOKIE_SIZE/2,COOKIE_SIZE-10,text="",fill=BG_COLOR,
+            font=("Helvetica",8))
+        self._cookie_flush = None
+        self._video_hidden = False
+        self._clicks       = 0
+        self._dropped      = 0
+        self.sched.every(1000, self._update_input_stats, group="ui")
         self.cookie.bind("<Button-1>",lambda _:self._on_cookie())
         self.cookie.grid(row=0,column=1,padx=5,sticky="n")
         # PYTHAGORE
@@ -188,6 +390,7 @@ class TaxiOverlay:
         self.ea = tk.Entry(calc,width=5,justify="center"); self.ea.pack(pady=2)
         self.eb = tk.Entry(calc,width=5,justify="center"); self.eb.pack(pady=2)
         tk.Button(calc,text="Calc √(a²+b²)",command=self._calc).pack(pady=2)
+        tk.Button(calc,text="Lot…",command=self._open_batch).pack()
         self.res= tk.Label(calc,text="?",bg=MASK_COLOR,
                            fg=TEXT_COLOR,font=self.f_label)
         self.res.pack(pady=2)
@@ -200,7 +403,7 @@ class TaxiOverlay:
         inv = tk.Frame(frm,width=INV_W,bg=MASK_COLOR)
         self.inv_labels={}
         for i,up in enumerate(self.upgrades):
-            lbl=tk.Label(inv,text=f"{up['emoji']} x{up['count']}",
+            lbl=tk.Label(inv,text=f"{up.emoji} x{up.count}",
                          bg=MASK_COLOR,fg=TEXT_COLOR,font=self.f_label)
             lbl.pack(pady=2); self.inv_labels[i]=lbl
         inv.grid(row=0,column=4,padx=5,sticky="n")
@@ -211,13 +414,13 @@ class TaxiOverlay:
 
     def _play_audio_bg(self):
         """ Joue en boucle le son de fond (AUDIO_BG_URL). """
-        with YoutubeDL({"format":"bestaudio"}) as ydl:
-            info = ydl.extract_info(AUDIO_BG_URL, download=False)
-        url = info["url"]
-        inst = vlc.Instance()
-        media = inst.media_new(url)
-        self.audio_player = inst.media_player_new()
-        self.audio_player.set_media(media)
+        self.resolver.resolve_local(AUDIO_BG_URL, AUDIO_FORMAT,
+                                   self._start_audio_bg)
+        self._watch_streams()
+
+    def _start_audio_bg(self, url):
+        self.audio_player = self.players.acquire()
+        self.players.load(self.audio_player, url)
         self.audio_player.play()
     def _open_shop(self):
         if self.shop_window and self.shop_window.winfo_exists():
@@ -225,57 +428,73 @@ class TaxiOverlay:
             return
         w = tk.Toplevel(self.root); w.title("Boutique d'auto-clics")
         w.config(bg=MASK_COLOR); self.shop_window = w
+        for lbl in self.shop_labels.values():
+            self.view.forget(lbl)   # labels de la fenêtre précédente
+        self.shop_labels = {}
         for i,up in enumerate(self.upgrades):
             f = tk.Frame(w,bg=MASK_COLOR)
-            lbl = tk.Label(f,text=f"{up['emoji']} x{up['count']}",
+            lbl = tk.Label(f,text=f"{up.emoji} x{up.count}",
                            bg=MASK_COLOR,fg=TEXT_COLOR,font=self.f_label)
-            btn = tk.Button(f,text=f"Buy {up['emoji']} ({up['cost']}🍪)",
+            btn = tk.Button(f,text=f"Buy {up.emoji} ({up.cost}🍪)",
                             command=lambda i=i: self._buy_upgrade(i))
             lbl.pack(side="left",padx=5); btn.pack(side="left",padx=5)
-            f.pack(pady=5,padx=10)
+            f.pack(pady=5,padx=10); self.shop_labels[i] = lbl
         tk.Button(w,text="Fermer",command=w.destroy).pack(pady=5)
 
     def _buy_upgrade(self,idx):
         if not (self.shop_window and self.shop_window.winfo_exists()):
             return
-        up = self.upgrades[idx]
-        if self.click_count >= up['cost']:
-            self.click_count -= up['cost']
-            up['count'] += 1
-            for w in self.shop_window.winfo_children():
-                if isinstance(w,tk.Frame):
-                    lbl = w.winfo_children()[0]
-                    if lbl.cget("text").startswith(up['emoji']):
-                        lbl.config(text=f"{up['emoji']} x{up['count']}")
-            self.inv_labels[idx].config(text=f"{up['emoji']} x{up['count']}")
-            self._update_cookie()
-        else:
+        if not self.game.do("buy", idx):
             self.status_lbl.config(text="Pas assez de cookies")
 
-    def _start_upgrades(self):
-        for i,up in enumerate(self.upgrades):
-            self.root.after(up['interval'],lambda i=i:self._upgrade_tick(i))
+    def _on_economy(self, event, *args):
+        if event == "cookies":
+            self._request_cookie_update()
+        elif event == "upgrade":
+            self._update_upgrade_labels(args[0])
 
-    def _upgrade_tick(self,idx):
-        up = self.upgrades[idx]
-        if up['count']>0:
-            self.click_count += up['amount']*up['count']
-            self._update_cookie()
-        self.root.after(up['interval'],lambda i=idx:self._upgrade_tick(i))
+    def _update_upgrade_labels(self, idx):
+        up  = self.upgrades[idx]
+        txt = f"{up.emoji} x{up.count}"
+        lbl = self.shop_labels.get(idx)
+        if lbl is not None and lbl.winfo_exists():
+            self.view.config(lbl, text=txt)
+        self.view.config(self.inv_labels[idx], text=txt)
+
+    def _start_upgrades(self):
+        # un seul job quel que soit le nombre d'auto-clics : le revenu est
+        # calculé sur le temps écoulé, rien n'est perdu si Tk prend du retard
+        self.sched.every(UPDATE_MS, self.economy.settle, group="upgrades",
+                         name="_upgrade_tick")
 
     def _create_video(self):
         vf = tk.Frame(self.root,width=METER_W,height=VIDEO_H,bg=MASK_COLOR)
         vf.grid(row=1,column=0,columnspan=4,sticky="nw")
         self.video_frame = vf
+        # solde restauré déjà sous –100 : cadre masqué dès sa création
+        self._update_video_visibility()
 
     def _play_video(self):
-        with YoutubeDL({"format":"best"}) as ydl:
-            info = ydl.extract_info(YT_URL, download=False)
-        url    = info["url"]
-        inst   = vlc.Instance(['--input-repeat=-1','--no-video-title-show'])
-        media  = inst.media_new(url)
-        player = inst.media_player_new()
-        player.set_media(media)
+        self.resolver.resolve_local(YT_URL, VIDEO_FORMAT, self._start_video)
+        self._watch_streams()
+
+    def _watch_streams(self):
+        """ Sonde la queue du resolver tant qu'une résolution ou la vidéo
+        spéciale (événements VLC) est en attente. """
+        if self._stream_job is None:
+            self._stream_job = self.sched.every(
+                RESOLVE_POLL_MS, self._poll_streams, group="media",
+                name="_poll_streams/_check_special_end")
+
+    def _poll_streams(self):
+        self.resolver.poll()
+        if not (self.resolver.pending() or getattr(self, "special_player", None)):
+            self.sched.cancel(self._stream_job)
+            self._stream_job = None
+
+    def _start_video(self, url):
+        player = self.players.acquire()
+        self.players.load(player, url, ':input-repeat=-1')
         player.set_hwnd(self.video_frame.winfo_id())
         player.play()
         # → playback à 100×
@@ -301,8 +520,11 @@ class TaxiOverlay:
             fill="white", dash=(5,3), width=2
         )
 
-        self.horse_positions = [0]*HORSE_COUNT
+        self.race = self.game.race
+        self.race.finish = self.finish
+        self.race.subscribe(self._on_race)
         self.horse_rects = []
+        self._horse_x    = [0]*HORSE_COUNT   # abscisse affichée par couloir
         colors = ["red","blue","yellow","orange","purple","cyan"]
         for i in range(HORSE_COUNT):
             y = i*lane_h + lane_h/2
@@ -333,97 +555,168 @@ class TaxiOverlay:
             fr, text="", bg="#552200", fg=ACCENT, font=self.f_label
         )
         self.horse_result_lbl.pack(pady=4)
+        self.odds_lbl = tk.Label(fr, text="", bg="#552200", fg=TEXT_COLOR,
+                                 font=("Helvetica", 8), wraplength=FAIR_W-10)
+        self.odds_lbl.pack()
+        # tableau des cotes simulé hors du thread Tk
+        self.resolver.submit(self.race.compute_odds, self._show_odds)
+        self._watch_streams()
+
+    def _show_odds(self, odds):
+        if odds is None:
+            return   # NumPy absent : cotes uniformes
+        self.game.do("odds", odds)
+        self.odds_lbl.config(text="Cotes : " + "  ".join(
+            f"{i+1}×{o:.1f}" for i,o in enumerate(self.race.odds)))
 
     def _start_horse_race(self):
         try:
             stake = int(self.horse_bet_entry.get())
         except ValueError:
-            self.horse_result_lbl.config(text="Mise invalide"); return
-        if stake <= 0 or stake > self.click_count:
-            self.horse_result_lbl.config(text="Pas assez de cookies"); return
-
-        self.click_count -= stake; self._update_cookie()
-        self._horse_stake = stake
-        for i,rect in enumerate(self.horse_rects):
-            self.horse_positions[i] = 0
-            y1,y2 = self.horse_canvas.coords(rect)[1], self.horse_canvas.coords(rect)[3]
-            self.horse_canvas.coords(rect, 0, y1, HORSE_SIZE, y2)
-        self.horse_result_lbl.config(text="")
-        self._animate_horses()
-
-    def _animate_horses(self):
-        winner = None
-        for i,rect in enumerate(self.horse_rects):
-            step = random.randint(1,8)
-            self.horse_positions[i] += step
-            if self.horse_positions[i] >= self.finish:
-                winner = i
-            y1,y2 = self.horse_canvas.coords(rect)[1], self.horse_canvas.coords(rect)[3]
-            self.horse_canvas.coords(
-                rect,
-                self.horse_positions[i], y1,
-                self.horse_positions[i]+HORSE_SIZE, y2
-            )
-        if winner is None:
-            self.root.after(HORSE_DELAY, self._animate_horses)
-        else:
-            pari  = self.var_horse_bet.get()
-            num   = winner + 1
-            stake = getattr(self, '_horse_stake', 0)
-            if pari == num:
-                gain = stake * 2
-                self.click_count += gain
+            self.view.config(self.horse_result_lbl, text="Mise invalide"); return
+        try:
+            self.game.do("race", self.var_horse_bet.get(), stake)
+        except ValueError as e:
+            self.view.config(self.horse_result_lbl, text=str(e)); return
+        self.sched.cancel(getattr(self, '_horse_job', None))
+        self._horse_job = self.sched.every(HORSE_DELAY,
+                                           lambda: self.game.do("step"),
+                                           group="horses", delay_ms=0,
+                                           name="_animate_horses")
+
+    def _on_race(self, event, *args):
+        if event == "start":
+            self.view.config(self.horse_result_lbl, text="")
+            self._draw_horses([0]*HORSE_COUNT)
+        elif event == "step":
+            self._draw_horses(args[0])
+        elif event == "finish":
+            self.sched.cancel(self._horse_job)
+            num, gain = args
+            if gain:
                 msg = f"Cheval {num} gagne ! +{gain}🍪"
             else:
-                msg = f"Cheval {num} gagne. –{stake}🍪"
-            self.horse_result_lbl.config(text=msg)
-            self._update_cookie()
+                msg = f"Cheval {num} gagne. –{self.race.stake}🍪"
+            self.view.config(self.horse_result_lbl, text=msg)
+
+    def _draw_horses(self, positions):
+        # déplacement relatif : pas de relecture des coordonnées du canvas
+        for i,(pos,rect) in enumerate(zip(positions,self.horse_rects)):
+            dx = pos - self._horse_x[i]
+            if dx:
+                self.horse_canvas.move(rect, dx, 0)
+        self._horse_x = list(positions)
 
     def _schedule_special_video(self):
-        # lance la vidéo spéciale après l'intervalle
-        self.root.after(SPECIAL_VIDEO_INTERVAL_MS, self._show_special_video)
+        # précharge la vidéo spéciale avant son créneau, puis la lance
+        for job in getattr(self, "_special_jobs", ()):
+            self.sched.cancel(job)
+        self._special_ready = False
+        self._special_due   = False
+        self._special_shown = False
+        self._special_jobs  = [
+            self.sched.once(SPECIAL_VIDEO_INTERVAL_MS - SPECIAL_PREFETCH_MS,
+                            self._prefetch_special_video, group="media"),
+            self.sched.once(SPECIAL_VIDEO_INTERVAL_MS,
+                            self._show_special_video, group="media"),
+        ]
 
-    def _show_special_video(self):
-        # cache la vidéo normale
-        if hasattr(self, 'video_frame'):
-            self.video_frame.grid_remove()
+    def _prefetch_special_video(self):
+        self.resolver.resolve_local(SPECIAL_VIDEO_URL, SPECIAL_FORMAT,
+                                    self._prebuffer_special_video,
+                                    on_error=self._special_video_failed)
+        self._watch_streams()
 
-        # overlay plein écran
+    def _prebuffer_special_video(self, url):
+        # overlay plein écran construit mais pas encore placé
         self.special_frame = tk.Frame(self.root,
                                       width=TOTAL_W, height=TOTAL_H, bg="black")
-        self.special_frame.place(x=0, y=0)
         vf = tk.Frame(self.special_frame,
                       width=TOTAL_W, height=TOTAL_H, bg=MASK_COLOR)
         vf.pack(expand=True, fill="both")
 
-        # lance la vidéo spéciale
-        inst = vlc.Instance(['--no-video-title-show'])
-        with YoutubeDL({"format":"best"}) as ydl:
-            info = ydl.extract_info(SPECIAL_VIDEO_URL, download=False)
-        media = inst.media_new(info["url"])
-        self.special_player = inst.media_player_new()
-        self.special_player.set_media(media)
-        self.special_player.set_hwnd(vf.winfo_id())
-        self.special_player.play()
-
-        # début du polling pour détecter la fin
-        self._check_special_end()
-
-    def _check_special_end(self):
-        state = self.special_player.get_state()
-        if state == vlc.State.Ended:
+        # le lecteur ouvre et remplit son tampon puis se met en pause
+        player = self.special_player = self.players.acquire()
+        self.players.load(player, url, ':start-paused')
+        player.set_hwnd(vf.winfo_id())
+
+        # événements VLC (thread libvlc) → thread Tk via la queue du resolver
+        post = self.resolver.post
+        events = self.players.vlc.EventType
+        self.players.attach(player, events.MediaPlayerPaused,
+                            lambda e: post(self._special_buffered))
+        self.players.attach(player, events.MediaPlayerEndReached,
+                            lambda e: post(self._hide_special_video))
+        self.players.attach(player, events.MediaPlayerEncounteredError,
+                            lambda e: post(self._special_video_failed,
+                                           "erreur VLC"))
+        player.play()
+        self._watch_streams()
+        # un événement VLC perdu ne doit pas arrêter le cycle
+        self._special_jobs.append(self.sched.once(
+            SPECIAL_BUFFER_TIMEOUT_MS, self._special_buffer_timeout,
+            group="media"))
+
+    def _special_buffer_timeout(self):
+        if getattr(self, 'special_player', None) and not self._special_ready:
+            self._special_video_failed("préchargement sans réponse de VLC")
+
+    def _special_buffered(self):
+        if not getattr(self, 'special_player', None):
+            return  # événement en retard d'un lecteur déjà rendu au pool
+        self._special_ready = True
+        if self._special_due:
+            self._show_special_video()
+
+    def _special_video_failed(self, err):
+        print(f"[Warning] Vidéo spéciale indisponible : {err}")
+        if getattr(self, "_special_shown", False):
+            # déjà à l'écran : même fin que la lecture (vidéo normale rétablie)
             self._hide_special_video()
-        else:
-            self.root.after(500, self._check_special_end)
+            return
+        self._release_special_video()
+        self._schedule_special_video()
 
-    def _hide_special_video(self):
+    def _show_special_video(self):
+        self._special_due = True
+        if not self._special_ready:
+            return  # lancée dès que le tampon est prêt (_special_buffered)
+        self._special_due = False
+        # cache la vidéo normale
+        if hasattr(self, 'video_frame'):
+            self.video_frame.grid_remove()
+        self._special_shown = True
+        self.special_frame.place(x=0, y=0)
+        self.special_player.set_pause(0)
+        self._special_jobs.append(self.sched.once(
+            SPECIAL_MAX_PLAY_MS, self._hide_special_video, group="media"))
+
+    def _release_special_video(self):
         # arrête et détruit l'overlay spéciale
-        if hasattr(self, 'special_player'):
-            self.special_player.stop()
+        # le lecteur retourne au pool (événements détachés, media relâché)
+        if getattr(self, 'special_player', None):
+            self.players.release(self.special_player)
+            self.special_player = None
         if hasattr(self, 'special_frame'):
             self.special_frame.destroy()
-        # restore la vidéo normale
-        if USE_VIDEO and hasattr(self, 'video_frame'):
+        self._special_shown = False
+        # "media" gardé actif pour elle en mode éco (_on_power)
+        if self.power.mode is ECO:
+            self.sched.pause("media")
+        if DEBUG:
+            print(f"[Debug] VLC : {self.players.stats()}")
+
+    def _special_active(self):
+        # fin (événement VLC via _poll_streams) et délai de secours sont
+        # dans le groupe "media" : le suspendre figerait la vidéo à l'écran
+        return getattr(self, 'special_player', None) is not None
+
+    def _hide_special_video(self):
+        if not getattr(self, 'special_player', None):
+            return   # fin déjà traitée (délai de secours ou événement en retard)
+        self._release_special_video()
+        # restore la vidéo normale (sauf si masquée par les cookies)
+        if USE_VIDEO and hasattr(self, 'video_frame') and not self._video_hidden:
             self.video_frame.grid()
         # reprogramme la prochaine diffusion
         self._schedule_special_video()
@@ -435,10 +728,14 @@ class TaxiOverlay:
                        bg=MASK_COLOR, highlightthickness=0)
         bj.grid(row=2, column=0, columnspan=6, sticky="nw", pady=5)
 
-        if TABLE_IMG:
-            img = TABLE_IMG.resize((BJ_W, BJ_H2), Image.LANCZOS)
-            self._bj_bg = ImageTk.PhotoImage(img)
-            bj.create_image(0, 0, anchor="nw", image=self._bj_bg)
+        if HAS_TABLE:
+            # PNG pré-redimensionné : relu par Tk sans PIL ni LANCZOS
+            try:
+                self._bj_bg = tk.PhotoImage(
+                    file=thumbnail(IMAGE_PATH, (BJ_W, BJ_H2)))
+                bj.create_image(0, 0, anchor="nw", image=self._bj_bg)
+            except (OSError, ImportError, tk.TclError) as e:
+                print(f"[Warning] Table de Blackjack non chargée : {e}")
 
         self.dealer_lbl = tk.Label(self.root, text="Dealer:", bg=TABLE_GREEN,
                                    fg=TEXT_COLOR, font=self.f_label)
@@ -455,6 +752,8 @@ class TaxiOverlay:
         self.bet_entry  = tk.Entry(self.root, width=5, justify="center")
         self.bet_btn    = tk.Button(self.root, text="Place Bet",
                                     command=self._place_bet)
+        self.advice_lbl = tk.Label(self.root, text="", bg=TABLE_GREEN,
+                                   fg=TEXT_COLOR, font=("Helvetica", 9))
 
         pos = {
             "dealer": (0.15*BJ_W,      0.20*BJ_H2),
@@ -463,6 +762,7 @@ class TaxiOverlay:
             "hit":    (0.60*BJ_W,      0.80*BJ_H2),
             "stand":  (0.70*BJ_W,      0.80*BJ_H2),
             "new":    (0.80*BJ_W,      0.80*BJ_H2),
+            "advice": (0.65*BJ_W, 0.80*BJ_H2-25),
             "bet_e":  (0.85*BJ_W,      0.50*BJ_H2),
             "bet_b":  (0.85*BJ_W, 0.50*BJ_H2+25),
         }
@@ -470,96 +770,133 @@ class TaxiOverlay:
             "dealer": self.dealer_lbl, "player": self.player_lbl,
             "status": self.status_lbl, "hit": self.hit_btn,
             "stand": self.stand_btn,  "new": self.new_btn,
-            "bet_e": self.bet_entry,  "bet_b": self.bet_btn
+            "bet_e": self.bet_entry,  "bet_b": self.bet_btn,
+            "advice": self.advice_lbl
         }.items():
             bj.create_window(*pos[key], window=widget, anchor="center")
+        self.bj = self.game.blackjack
+        self.bj.subscribe(self._on_blackjack)
+        self.advisor = None
+        if USE_ADVISOR:
+            # table lue du cache (ou simulée) hors du thread Tk
+            threading.Thread(target=self._load_advisor, daemon=True).start()
         self._bj_new()
 
+    def _load_advisor(self):
+        from advisor import Advisor, load_table
+        self.advisor = Advisor(load_table())
+
     def _bj_new(self):
         self.bet_entry.config(state="normal"); self.bet_entry.delete(0, tk.END)
         self.bet_btn.config(state="normal")
         self.hit_btn.config(state="disabled"); self.stand_btn.config(state="disabled")
         self.new_btn.config(state="disabled"); self.status_lbl.config(text="")
-        self.dealer_lbl.config(text="Dealer:"); self.player_lbl.config(text="Player:")
+        self.view.config(self.dealer_lbl, text="Dealer:")
+        self.view.config(self.player_lbl, text="Player:")
 
     def _place_bet(self):
         try:
             amt = int(self.bet_entry.get())
-            if amt > 0:
-                self.current_bet = amt
-                self.click_count -= amt
-                self._update_cookie()
-                self.bet_entry.config(state="disabled")
-                self.bet_btn.config(state="disabled")
-                self._deal_hand()
-            else:
-                self.status_lbl.config(text="Mise doit être > 0")
         except ValueError:
-            self.status_lbl.config(text="Mise invalide")
-
-    def _deal_hand(self):
-        vals  = ['2','3','4','5','6','7','8','9','10','J','Q','K','A']
-        suits = ['♠','♥','♦','♣']
-        deck  = [v+s for v in vals for s in suits]; random.shuffle(deck)
-        self.bj_player = [deck.pop(), deck.pop()]
-        self.bj_dealer = [deck.pop(), deck.pop()]
-        self.bj_deck   = deck
-        self._bj_update_labels()
+            self.status_lbl.config(text="Mise invalide"); return
+        try:
+            self.game.do("bet", amt)
+        except ValueError as e:
+            self.status_lbl.config(text=str(e)); return
+        self.bet_entry.config(state="disabled")
+        self.bet_btn.config(state="disabled")
         self.hit_btn.config(state="normal"); self.stand_btn.config(state="normal")
 
+    def _on_blackjack(self, event, *args):
+        if event == "hand":
+            self._bj_update_labels()
+        elif event == "result":
+            self.status_lbl.config(text=args[0])
+            self.view.config(self.advice_lbl, text="")
+            self.hit_btn.config(state="disabled"); self.stand_btn.config(state="disabled")
+            self.new_btn.config(state="normal")
+
     def _bj_update_labels(self):
-        def score(hand):
-            tot, aces = 0,0
-            for c in hand:
-                v = c[:-1]
-                if v=='A': tot+=11; aces+=1
-                elif v in('K','Q','J'): tot+=10
-                else: tot+=int(v)
-            while tot>21 and aces: tot-=10; aces-=1
-            return tot
-        ds, ps = score(self.bj_dealer), score(self.bj_player)
-        self.dealer_lbl.config(text=f"Dealer: {' '.join(self.bj_dealer)} ({ds})")
-        self.player_lbl.config(text=f"Player: {' '.join(self.bj_player)} ({ps})")
+        dealer, player = self.bj.dealer, self.bj.player
+        self.view.config(self.dealer_lbl, text=f"Dealer: {dealer} ({dealer.total})")
+        self.view.config(self.player_lbl, text=f"Player: {player} ({player.total})")
+        if self.advisor and self.bj.in_round:
+            action, eh, es = self.advisor.advise(player, dealer)
+            self.view.config(
+                self.advice_lbl,
+                text=f"Conseil : {action} (Hit {eh:+.2f} / Stand {es:+.2f})")
 
     def _bj_hit(self):
-        self.bj_player.append(self.bj_deck.pop()); self._bj_update_labels()
-        if self._bj_score(self.bj_player)>21: self._end_round("Busted!")
+        self.game.do("hit")
 
     def _bj_stand(self):
-        while self._bj_score(self.bj_dealer)<17:
-            self.bj_dealer.append(self.bj_deck.pop())
-        self._bj_update_labels()
-        ps, ds = self._bj_score(self.bj_player), self._bj_score(self.bj_dealer)
-        if ds>21 or ps>ds:    res="You win!"
-        elif ps==ds:          res="Push!"
-        else:                 res="Dealer wins!"
-        self._end_round(res)
-
-    def _end_round(self, result):
-        if result=="You win!": self.click_count += 2*self.current_bet
-        elif result=="Push!":  self.click_count += self.current_bet
-        self._update_cookie()
-        self.status_lbl.config(text=result)
-        self.hit_btn.config(state="disabled"); self.stand_btn.config(state="disabled")
-        self.new_btn.config(state="normal"); self.current_bet=0
-
-    def _bj_score(self, hand):
-        tot, aces = 0,0
-        for c in hand:
-            v = c[:-1]
-            if v=='A': tot+=11; aces+=1
-            elif v in('K','Q','J'): tot+=10
-            else: tot+=int(v)
-        while tot>21 and aces: tot-=10; aces-=1
-        return tot
+        self.game.do("stand")
+
+    # -- debug --
+    def _toggle_debug_panel(self):
+        panel = getattr(self, "debug_panel", None)
+        if panel and panel.winfo_exists():
+            panel.destroy(); self.sched.cancel(self._debug_job); return
+        self.debug_panel = tk.Toplevel(self.root)
+        self.debug_panel.title("Profil boucle Tk")
+        lbl = tk.Label(self.debug_panel, justify="left",
+                       font=("Courier", 9), bg=BG_COLOR, fg=TEXT_COLOR)
+        lbl.pack(fill="both", expand=True)
+        self._debug_job = self.sched.every(
+            1000, lambda: lbl.config(text=self._debug_report()),
+            group="debug", delay_ms=0, name="_debug_panel")
+
+    def _debug_report(self):
+        sent, skipped = self.tk_rate
+        return "\n".join((self.prof.report(), self.power.report(),
+                          f"Tk : {sent:.0f} commandes/s, {skipped:.0f} évitées/s"))
 
     # -- drag, salary, encouragement, cookie, calc --
     def _bind_drag(self):
+        self.meter.bind("<Double-Button-1>", lambda _: self._open_stats())
         self.meter.bind("<ButtonPress-1>", self._press)
         self.meter.bind("<B1-Motion>",     self._drag)
         self.cookie.bind("<ButtonPress-3>", self._press)
         self.cookie.bind("<B3-Motion>",     self._drag)
 
+    def _bind_power(self):
+        touch = lambda _: self.power.touch()
+        for seq in ("<Motion>", "<KeyPress>", "<ButtonPress>"):
+            self.root.bind_all(seq, touch, add="+")
+        # compteur entièrement recouvert, ou fenêtre réduite
+        self.meter.bind("<Visibility>", self._meter_visibility)
+        self.root.bind("<Unmap>", lambda e: e.widget is self.root
+                       and self.power.set_hidden(True))
+        self.root.bind("<Map>", lambda e: e.widget is self.root
+                       and self.power.set_hidden(False))
+        self.sched.every(POWER_POLL_MS, self.power.update, name="_check_idle")
+
+    def _meter_visibility(self, e):
+        # recouvert par notre propre vidéo spéciale : pas un masquage
+        if getattr(self, "_special_shown", False):
+            return
+        self.power.set_hidden(e.state == "VisibilityFullyObscured")
+
+    def _on_power(self, event, mode):
+        eco = mode is ECO
+        self.sched.cancel(self._salary_job)
+        self._salary_job = self.sched.every(
+            UPDATE_ECO_MS if eco else UPDATE_MS, self._update_salary,
+            group="ui", delay_ms=0)
+        # plus aucun réveil à 20 Hz : course, sondage des flux et des
+        # requêtes SQLite, vidéo spéciale reprennent à la première saisie
+        for group in ECO_PAUSED_GROUPS:
+            if eco and not (group == "media" and self._special_active()):
+                self.sched.pause(group)
+            else:
+                self.sched.resume(group)
+        for name in ("video_player", "audio_player"):
+            player = getattr(self, name, None)
+            if player:
+                player.set_pause(int(eco))
+        if DEBUG:
+            print(f"[Debug] mode {mode}")
+
     def _press(self, e):
         self._dx, self._dy = e.x_root, e.y_root
 
@@ -570,41 +907,240 @@ class TaxiOverlay:
         self._dx, self._dy = e.x_root, e.y_root
 
     def _update_salary(self):
-        elapsed = time.time() - self.start
-        amt     = (SALARY_PER_HOUR/3600.0) * elapsed
-        self.meter.itemconfigure(self.text_id, text=f"{amt:,.2f}")
-        self.root.after(UPDATE_MS, self._update_salary)
+        amt = self.pay.earned(self.start, self.wall())
+        self.view.itemconfigure(self.meter, self.text_id, text=f"{amt:,.2f}")
+        if self.metrics:
+            self._publish_metrics(amt)
+
+    def _publish_metrics(self, amt):
+        # dict neuf à chaque tick : le serveur n'en lit que la référence
+        session = self.stats.session
+        self.metrics.publish({
+            "t":                 time.time(),
+            "salary_earned":     amt,
+            "clicks_total":      self._click_total,
+            "cookies":           self.economy.cookies,
+            "upgrades":          [({"emoji": u.emoji}, u.count)
+                                  for u in self.upgrades],
+            "game_rounds_total": [({"game": g}, v[0]) for g, v in session.items()],
+            "game_net_cookies":  [({"game": g}, v[2]) for g, v in session.items()],
+            "loop_lag_seconds":  self.sched.lag,
+            "tk_commands_per_second": self.tk_rate[0],
+            "eco_mode":          int(self.power.mode is ECO),
+        })
+
+    def _record_salary(self):
+        self.stats.record_day(self.pay, self.start, self.wall())
+
+    # -- statistiques --
+    def _open_stats(self):
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        w = self.stats_window = tk.Toplevel(self.root)
+        w.title("Statistiques"); w.config(bg=BG_COLOR)
+        self.stats_lbl = tk.Label(w, text="…", justify="left",
+                                  font=("Courier", 9), bg=BG_COLOR, fg=TEXT_COLOR)
+        self.stats_lbl.pack(fill="both", expand=True, padx=10, pady=10)
+        job = self.sched.every(STATS_REFRESH_MS, self._refresh_stats,
+                               group="ui", delay_ms=0)
+        w.bind("<Destroy>", lambda e: e.widget is w and self.sched.cancel(job))
+
+    def _refresh_stats(self):
+        # requête sur le thread SQLite, affichage au prochain poll()
+        self.stats.query(summary, self._show_stats)
+
+    def _show_stats(self, result):
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_lbl.config(text=format_summary(result))
 
     def _schedule_enc(self):
-        msg = random.choice(MESSAGES)
+        msg = self.msg_rng.choice(MESSAGES)
         if hasattr(self, "enc_id"):
             self.meter.delete(self.enc_id)
         self.enc_id = self.meter.create_text(
             METER_W/2, METER_H-15,
             text=msg, fill=ACCENT, font=self.f_label
         )
-        self.root.after(5000, lambda: self.meter.delete(self.enc_id))
-        self.root.after(ENCOURAGE_MS, self._schedule_enc)
+        self.sched.once(5000, lambda: self.meter.delete(self.enc_id), group="ui")
 
     def _on_cookie(self):
-        self.click_count += 1
-        self._update_cookie()
+        # le clic est compté tout de suite, l'affichage suit à la frame
+        self._clicks += 1
+        self._click_total += 1
+        self.game.do("click")
+
+    def _request_cookie_update(self):
+        if self._cookie_flush is None:
+            self._cookie_flush = time.monotonic() + FRAME_MS/1000.0
+            self.sched.once(FRAME_MS, self._update_cookie, group="ui")
 
     def _update_cookie(self):
-        self.cookie.itemconfigure(self.cookie_text, text=f"🍪 {self.click_count}")
-        if USE_VIDEO and hasattr(self, "video_frame"):
-            if self.click_count < -100:
+        if self._cookie_flush is not None:
+            late = time.monotonic() - self._cookie_flush
+            self._dropped += max(0, int(late*1000 // FRAME_MS))
+            self._cookie_flush = None
+        cookies = self.economy.cookies
+        self.view.itemconfigure(self.cookie, self.cookie_text, text=f"🍪 {cookies}")
+        self._update_video_visibility()
+
+    def _update_video_visibility(self):
+        # relayout uniquement quand le seuil des –100 est franchi
+        hidden = self.economy.cookies < -100
+        if USE_VIDEO and hasattr(self, "video_frame") and hidden != self._video_hidden:
+            if hidden:
                 self.video_frame.grid_remove()
             else:
                 self.video_frame.grid()
+            self._video_hidden = hidden
+
+    def _update_input_stats(self):
+        txt = f"{self._clicks} clics/s · {self._dropped} perdues"
+        self._clicks = 0
+        self.view.itemconfigure(self.cookie, self.cookie_stats, text=txt)
+        self.tk_rate = self.view.tk_rate()
+        if self.prof:
+            self.prof.gauge("tk_sent_per_s",    self.tk_rate[0])
+            self.prof.gauge("tk_skipped_per_s", self.tk_rate[1])
 
     def _calc(self):
         try:
             a = float(self.ea.get()); b = float(self.eb.get())
-            r = (a*a + b*b)**0.5
-            self.res.config(text=f"{r:.2f}")
+            self.res.config(text=f"{math.hypot(a, b):.2f}")
         except ValueError:
             self.res.config(text="?")
 
+    # -- calculatrice par lots --
+    def _open_batch(self):
+        if self.batch_window and self.batch_window.winfo_exists():
+            self.batch_window.lift()
+            return
+        w = self.batch_window = tk.Toplevel(self.root)
+        w.title("Pythagore par lots"); w.config(bg=MASK_COLOR)
+        tk.Label(w, text="Un vecteur par ligne (x y z…, virgules acceptées)",
+                 bg=MASK_COLOR, fg=TEXT_COLOR).pack(padx=10, pady=(8, 2))
+        self.batch_text = tk.Text(w, width=40, height=10)
+        self.batch_text.pack(padx=10)
+        f = tk.Frame(w, bg=MASK_COLOR)
+        tk.Button(f, text="Calculer", command=self._batch_paste).pack(side="left", padx=5)
+        tk.Button(f, text="CSV…", command=self._batch_csv).pack(side="left", padx=5)
+        f.pack(pady=5)
+        self.batch_lbl = tk.Label(w, text="", justify="left", font=("Courier", 9),
+                                  bg=MASK_COLOR, fg=TEXT_COLOR)
+        self.batch_lbl.pack(padx=10, pady=(0, 8))
+
+    def _batch_paste(self):
+        try:
+            values = batch(self.batch_text.get("1.0", "end"))
+        except ValueError as e:
+            self.batch_lbl.config(text=f"? {e}")
+            return
+        self.batch_lbl.config(text=format_batch(values))
+
+    def _batch_csv(self):
+        from tkinter import filedialog
+        types = [("CSV", "*.csv"), ("Tous", "*")]
+        if self._batch_job:   # un lot CSV à la fois
+            return
+        path = filedialog.askopenfilename(parent=self.batch_window,
+                                          filetypes=types)
+        if not path:
+            return
+        # le dialogue demande confirmation avant de remplacer un fichier
+        out = filedialog.asksaveasfilename(
+            parent=self.batch_window, filetypes=types, defaultextension=".csv",
+            initialdir=os.path.dirname(path),
+            initialfile=os.path.basename(default_out(path)))
+        if not out:
+            return
+        progress = [0]   # lignes traitées, relues par _poll_batch
+
+        def work():
+            try:
+                self._batch_done.append(csv_norms(
+                    path, out, overwrite=True,
+                    progress=lambda n: progress.__setitem__(0, n)))
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                self._batch_done.append(e)
+
+        threading.Thread(target=work, daemon=True, name="pythagore").start()
+        self._batch_job = self.sched.every(
+            CALC_POLL_MS, lambda: self._poll_batch(progress), group="ui",
+            delay_ms=0, name="_poll_batch")
+
+    def _poll_batch(self, progress):
+        alive = self.batch_window and self.batch_window.winfo_exists()
+        if not self._batch_done:
+            if alive:
+                self.view.config(self.batch_lbl, text=f"{progress[0]:,} lignes…")
+            return
+        self.sched.cancel(self._batch_job)
+        self._batch_job = None
+        res = self._batch_done.pop()
+        if alive:
+            self.view.forget(self.batch_lbl)
+            self.batch_lbl.config(text=f"? {res}" if isinstance(res, Exception)
+                                  else format_csv(res))
+
+class TeamDashboard:
+    """ Mode tableau d'équipe : total agrégé et top N des employés du CSV. """
+
+    def __init__(self, path):
+        from team import Team, TEAM_TOP
+        self.team  = Team.from_csv(path)
+        self.wall  = WallClock()
+        self.root  = tk.Tk()
+        self.root.title("Compteur d'équipe")
+        self.root.config(bg=BG_COLOR)
+        self.f_label  = tkfont.Font(family="Helvetica", size=12, weight="bold")
+        self.f_salary = tkfont.Font(family="Helvetica", size=32, weight="bold")
+        self.view  = ViewModel()
+        self.sched = Scheduler(self.root)
+
+        top = min(TEAM_TOP, len(self.team.names))
+        c = self.canvas = tk.Canvas(
+            self.root, width=METER_W, height=METER_H + 10 + top*TEAM_ROW_H,
+            bg=BG_COLOR, highlightthickness=0)
+        round_rect(c,0,0,METER_W,METER_H,fill=BG_COLOR,outline=ACCENT,width=4)
+        round_rect(c,4,4,METER_W-4,30,fill=ACCENT,outline=ACCENT)
+        c.create_text(METER_W/2,18,text=f"TEAM · {len(self.team.names)}",
+                      fill=LABEL_COLOR,font=self.f_label)
+        self.total_id = c.create_text(
+            METER_W/2,METER_H/2+10,text="0.00",fill=TEXT_COLOR,font=self.f_salary)
+        self.rows = []
+        for k in range(top):
+            y = METER_H + 10 + k*TEAM_ROW_H + TEAM_ROW_H/2
+            self.rows.append((
+                c.create_text(10,y,anchor="w",fill=TEXT_COLOR,font=self.f_label),
+                c.create_text(METER_W-10,y,anchor="e",fill=ACCENT,font=self.f_label)))
+        c.pack(padx=10,pady=10)
+
+        self.sched.every(UPDATE_MS, self._tick, delay_ms=0)
+        self.root.mainloop()
+
+    def _tick(self):
+        # un calcul vectorisé pour tout le monde, Tk seulement pour le top
+        self.team.tick(self.wall())
+        c, view = self.canvas, self.view
+        view.itemconfigure(c, self.total_id, text=f"{self.team.total():,.2f}")
+        for k, ((name_id, amt_id), (name, amt)) in enumerate(
+                zip(self.rows, self.team.top(len(self.rows)))):
+            view.itemconfigure(c, name_id, text=f"{k+1}. {name}")
+            view.itemconfigure(c, amt_id,  text=f"{amt:,.2f}")
+
 if __name__=="__main__":
-    TaxiOverlay()
+    if "--tui" in sys.argv:
+        from tui import run
+        sys.exit(run(SALARY_PER_HOUR, MESSAGES,
+                     horse_finish=FAIR_W - 20 - HORSE_SIZE))
+    elif tk is None:
+        sys.exit("tkinter introuvable : lancer `python compteur.py --tui`")
+    elif "--team" in sys.argv:
+        args = sys.argv[sys.argv.index("--team") + 1:]
+        if not args or args[0].startswith("--"):
+            sys.exit("usage : python compteur.py --team employes.csv")
+        if not os.path.isfile(args[0]):
+            sys.exit(f"--team : fichier introuvable : {args[0]}")
+        TeamDashboard(args[0])
+    else:
+        TaxiOverlay()
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cœur du jeu sans interface graphique (aucun import Tk) :
+- Economy   : cookies, clics, auto-clics achetés (catalogue JSON) ;
+  le revenu des auto-clics est agrégé en un seul taux et crédité en
+  forme close sur le temps écoulé (coût constant quel que soit le
+  nombre d'auto-clics possédés),
+- Blackjack : mise, donne, hit/stand, règlement (croupier reste à 17),
+  sabot multi-jeux persistant codé en entiers (carte = rang*4 + couleur),
+  totaux mis à jour carte par carte, chaînes construites pour l'affichage,
+- HorseRace : pari, course entière calculée d'avance depuis une graine
+  (random.Random, identique avec ou sans NumPy) puis rejouée image par
+  image ; cotes
+  équitables tirées de 100k courses simulées en lot (NumPy).
+Chaque objet prévient ses abonnés via subscribe(fn) → fn(event, *args) ;
+l'overlay Tk n'est qu'une vue branchée sur ces événements.
+Toute action qui change l'état passe par GameState.do(op, *args) :
+le hasard vient d'une graine unique et chaque action peut être
+enregistrée (t en ms, op, args) pour être rejouée à l'identique.
+`python engine.py` simule des sessions complètes et affiche le débit.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+from array import array
+
+np = False   # NumPy importé au premier besoin (load_numpy), pas au démarrage
+
+HORSE_COUNT  = 6
+HORSE_FINISH = 160   # longueur de piste par défaut (px de l'overlay)
+HORSE_STEP   = (1, 8)
+HORSE_ODDS_RACES = 100_000
+# algorithme de plan_race, noté dans l'en-tête des sessions enregistrées
+RACE_PLAN    = "random.choices/1"
+
+# catalogue des auto-clics (repli intégré si le JSON est absent)
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "upgrades.json")
+UPGRADES = [
+    {'emoji':'🍓','cost':10,'interval':5000,'amount':1},
+    {'emoji':'🐌','cost':50,'interval':10000,'amount':5},
+]
+
+
+def load_catalog(path=CATALOG_PATH):
+    """ Liste de dicts {emoji, cost, interval (ms), amount}. """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return UPGRADES
+
+
+CARD_VALUES = ['2','3','4','5','6','7','8','9','10','J','Q','K','A']
+CARD_SUITS  = ['♠','♥','♦','♣']
+CARD_POINTS = bytes([2,3,4,5,6,7,8,9,10,10,10,10,11])   # par rang, as = 11
+
+SHOE_DECKS       = 6
+SHOE_PENETRATION = 0.75   # position de la carte de coupe (fraction du sabot)
+
+# résultats de manche (affichés tels quels par la vue)
+BJ_BUSTED = "Busted!"
+BJ_WIN    = "You win!"
+BJ_PUSH   = "Push!"
+BJ_LOSE   = "Dealer wins!"
+
+
+class Observable:
+    __slots__ = ("_listeners",)
+
+    def __init__(self):
+        self._listeners = []
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def _emit(self, event, *args):
+        for fn in self._listeners:
+            fn(event, *args)
+
+
+class Upgrade:
+    __slots__ = ("emoji", "cost", "interval", "amount", "count", "rate")
+
+    def __init__(self, emoji, cost, interval, amount, count=0):
+        self.emoji    = emoji
+        self.cost     = cost
+        self.interval = interval   # ms
+        self.amount   = amount
+        self.count    = count
+        self.rate     = amount * 1000.0 / interval   # cookies/s par unité
+
+
+class Economy(Observable):
+    """
+    Événements : ("cookies", total), ("upgrade", idx).
+    Le revenu de tous les auto-clics possédés est agrégé en un seul taux
+    entier (_units par ms, en 1/_denom de cookie), tenu à jour à chaque
+    achat ; settle() crédite taux × temps écoulé d'un coup et garde le
+    reste. Calcul exact : le résultat ne dépend pas de la fréquence des
+    appels, ce qui rend les rejeux reproductibles.
+    """
+    __slots__ = ("cookies", "upgrades", "clock", "_denom", "_units",
+                 "_since", "_frac")
+
+    def __init__(self, upgrades=None, cookies=0, clock=time.monotonic):
+        super().__init__()
+        self.cookies  = cookies
+        self.upgrades = [Upgrade(**u) for u in (upgrades or load_catalog())]
+        self.clock    = clock
+        self._denom   = math.lcm(*(u.interval for u in self.upgrades))
+        self._since   = self._ms()
+        self._frac    = 0
+        self.recompute_rate()
+
+    def _ms(self, now=None):
+        return round((self.clock() if now is None else now) * 1000)
+
+    def _unit_rate(self, up):
+        return up.amount * (self._denom // up.interval)
+
+    def recompute_rate(self):
+        self._units = sum(self._unit_rate(u) * u.count for u in self.upgrades)
+
+    @property
+    def rate(self):
+        """ Revenu passif total en cookies/s. """
+        return self._units * 1000.0 / self._denom
+
+    def settle(self, now=None):
+        """ Crédite le revenu passif accumulé depuis le dernier appel. """
+        now = self._ms(now)
+        acc = self._frac + self._units * (now - self._since)
+        self._since = now
+        gained, self._frac = divmod(acc, self._denom)
+        if gained:
+            self.add(gained)
+        return gained
+
+    def add(self, n):
+        """ Crédit (ou débit si n < 0) ; le solde peut devenir négatif. """
+        self.cookies += n
+        self._emit("cookies", self.cookies)
+
+    def click(self, n=1):
+        self.add(n)
+
+    def buy(self, idx):
+        up = self.upgrades[idx]
+        self.settle()   # l'ancien taux s'applique jusqu'à maintenant
+        if self.cookies < up.cost:
+            return False
+        up.count    += 1
+        self._units += self._unit_rate(up)
+        self.add(-up.cost)
+        self._emit("upgrade", idx)
+        return True
+
+
+def card_str(code):
+    return CARD_VALUES[code >> 2] + CARD_SUITS[code & 3]
+
+
+def card_points(code):
+    return CARD_POINTS[code >> 2]
+
+
+class Shoe:
+    """
+    Sabot de `decks` jeux : tableau d'octets mélangé une fois, lu par un
+    index. Remélangé entre deux manches une fois la carte de coupe passée.
+    """
+    __slots__ = ("rng", "cards", "pos", "cut")
+
+    def __init__(self, decks=SHOE_DECKS, rng=None,
+                 penetration=SHOE_PENETRATION):
+        self.rng   = rng or random.Random()
+        self.cards = array('B', range(52)) * decks
+        self.cut   = int(len(self.cards) * penetration)
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+
+    @property
+    def past_cut(self):
+        return self.pos >= self.cut
+
+    def draw(self):
+        if self.pos >= len(self.cards):
+            self.shuffle()
+        c = self.cards[self.pos]
+        self.pos += 1
+        return c
+
+
+class Hand:
+    """ Main : codes des cartes + total tenu à jour à chaque carte. """
+    __slots__ = ("cards", "total", "soft_aces")
+
+    def __init__(self):
+        self.cards     = []
+        self.total     = 0
+        self.soft_aces = 0   # as comptés 11
+
+    def add(self, code):
+        pts = CARD_POINTS[code >> 2]
+        self.cards.append(code)
+        self.total += pts
+        if pts == 11:
+            self.soft_aces += 1
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10; self.soft_aces -= 1
+
+    @property
+    def soft(self):
+        return self.soft_aces > 0
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __str__(self):
+        return ' '.join(card_str(c) for c in self.cards)
+
+
+class Blackjack(Observable):
+    """
+    Événements : ("bet", mise), ("hand",) après chaque carte,
+    ("result", texte).
+    """
+    __slots__ = ("economy", "shoe", "player", "dealer", "bet", "result")
+
+    def __init__(self, economy, rng=None, decks=SHOE_DECKS):
+        super().__init__()
+        self.economy = economy
+        self.shoe    = Shoe(decks, rng)
+        self.player  = Hand()
+        self.dealer  = Hand()
+        self.bet     = 0
+        self.result  = None
+
+    @property
+    def in_round(self):
+        return self.bet > 0 and self.result is None
+
+    def place_bet(self, amt):
+        if amt <= 0:
+            raise ValueError("Mise doit être > 0")
+        self.bet = amt
+        self.economy.add(-amt)
+        self._emit("bet", amt)
+        self.deal()
+
+    def deal(self):
+        shoe = self.shoe
+        if shoe.past_cut:
+            shoe.shuffle()
+        self.player, self.dealer = Hand(), Hand()
+        for hand in (self.player, self.player, self.dealer, self.dealer):
+            hand.add(shoe.draw())
+        self.result = None
+        self._emit("hand")
+
+    def hit(self):
+        self.player.add(self.shoe.draw())
+        self._emit("hand")
+        if self.player.total > 21:
+            self._end_round(BJ_BUSTED)
+
+    def stand(self):
+        while self.dealer.total < 17:
+            self.dealer.add(self.shoe.draw())
+        self._emit("hand")
+        ps, ds = self.player.total, self.dealer.total
+        if ds > 21 or ps > ds: res = BJ_WIN
+        elif ps == ds:         res = BJ_PUSH
+        else:                  res = BJ_LOSE
+        self._end_round(res)
+
+    def _end_round(self, result):
+        if result == BJ_WIN:    self.economy.add(2*self.bet)
+        elif result == BJ_PUSH: self.economy.add(self.bet)
+        self.result = result
+        self.bet    = 0
+        self._emit("result", result)
+
+
+def _race_winner(row, finish):
+    # sur le pas décisif, le dernier couloir arrivé l'emporte
+    return max(i for i, p in enumerate(row) if p >= finish)
+
+
+def load_numpy():
+    """ Module numpy importé au premier appel, ou None s'il manque
+    (cotes uniformes, calculatrice en math.hypot). """
+    global np
+    if np is False:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def plan_race(seed, count=HORSE_COUNT, finish=HORSE_FINISH):
+    """
+    Course complète pour une graine : (images, gagnant 0..n-1), images[k]
+    étant la position de chaque cheval après k+1 pas. Toujours en Python
+    pur (random.Random) : même course sur tout hôte, NumPy ou non, donc
+    sessions rejouables partout.
+    """
+    lo, hi = HORSE_STEP
+    rng    = random.Random(seed)
+    steps  = range(lo, hi+1)
+    pos    = [0]*count
+    frames = []
+    while max(pos) < finish:
+        pos = [p + s for p, s in zip(pos, rng.choices(steps, k=count))]
+        frames.append(pos)
+    return frames, _race_winner(frames[-1], finish)
+
+
+def odds_board(count=HORSE_COUNT, finish=HORSE_FINISH, races=HORSE_ODDS_RACES,
+               seed=0):
+    """
+    Probabilités de victoire par cheval estimées sur `races` courses
+    simulées ensemble ; None sans NumPy.
+    """
+    if load_numpy() is None:
+        return None
+    lo, hi = HORSE_STEP
+    rng   = np.random.default_rng(seed)
+    pos   = np.zeros((races, count), dtype=np.int16)
+    wins  = np.zeros(count, dtype=np.int64)
+    lanes = np.arange(count)
+    while len(pos):
+        pos += rng.integers(lo, hi+1, size=pos.shape, dtype=np.int16)
+        crossed = pos >= finish
+        done = crossed.any(axis=1)
+        if done.any():
+            # dernier couloir arrivé = plus grand indice franchissant la ligne
+            winners = np.where(crossed[done], lanes, -1).max(axis=1)
+            wins += np.bincount(winners, minlength=count)
+            pos = pos[~done]
+    return wins / races
+
+
+class HorseRace(Observable):
+    """
+    Événements : ("start",), ("step", positions), ("finish", numéro
+    gagnant 1..n, gain). La course est tirée en entier au départ
+    (plan_race) ; step() ne fait que passer à l'image suivante.
+    Un pari gagnant rapporte mise × odds[cheval] (cote équitable 1/p).
+    """
+    __slots__ = ("economy", "rng", "count", "finish", "positions",
+                 "pick", "stake", "winner", "seed", "frames", "frame",
+                 "odds")
+
+    def __init__(self, economy, rng=None, count=HORSE_COUNT,
+                 finish=HORSE_FINISH):
+        super().__init__()
+        self.economy   = economy
+        self.rng       = rng or random.Random()
+        self.count     = count
+        self.finish    = finish
+        self.positions = [0]*count
+        self.pick      = 1
+        self.stake     = 0
+        self.winner    = None
+        self.seed      = None
+        self.frames    = []
+        self.frame     = 0
+        self.odds      = [float(count)]*count   # chevaux supposés égaux
+
+    def compute_odds(self, races=HORSE_ODDS_RACES):
+        """ Cotes équitables (1/p) par simulation, None sans NumPy. """
+        probs = odds_board(self.count, self.finish, races)
+        if probs is None:
+            return None
+        return [1.0/p if p else 0.0 for p in probs.tolist()]
+
+    def set_odds(self, odds):
+        self.odds = list(odds)
+
+    @property
+    def running(self):
+        return self.stake > 0 and self.winner is None
+
+    def start(self, pick, stake, seed=None):
+        self.economy.settle()
+        if stake <= 0 or stake > self.economy.cookies:
+            raise ValueError("Pas assez de cookies")
+        self.economy.add(-stake)
+        self.pick      = pick
+        self.stake     = stake
+        self.winner    = None
+        self.positions = [0]*self.count
+        self.seed      = self.rng.getrandbits(32) if seed is None else seed
+        self.frames, _ = plan_race(self.seed, self.count, self.finish)
+        self.frame     = 0
+        self._emit("start")
+
+    def step(self):
+        """ Passe à l'image suivante ; renvoie le gagnant (1..n) ou None. """
+        self.positions = self.frames[self.frame]
+        self.frame += 1
+        self._emit("step", self.positions)
+        if self.frame == len(self.frames):
+            self._settle(_race_winner(self.positions, self.finish) + 1)
+        return self.winner
+
+    def _settle(self, num):
+        gain = int(self.stake * self.odds[num-1]) if self.pick == num else 0
+        self.winner = num
+        if gain:
+            self.economy.add(gain)
+        self._emit("finish", num, gain)
+        self.stake = 0
+
+
+# actions rejouables : op → (objet du GameState, méthode)
+OPS = {
+    "click": ("economy",   "click"),
+    "buy":   ("economy",   "buy"),
+    "bet":   ("blackjack", "place_bet"),
+    "hit":   ("blackjack", "hit"),
+    "stand": ("blackjack", "stand"),
+    "race":  ("race",      "start"),
+    "step":  ("race",      "step"),
+    "odds":  ("race",      "set_odds"),
+}
+
+
+class GameState:
+    """
+    Regroupe les trois moteurs autour d'une même économie et d'une même
+    graine. Si `log` est une liste, chaque do() réussi y ajoute
+    (t_ms, op, *args).
+    """
+    __slots__ = ("seed", "economy", "blackjack", "race", "log")
+
+    def __init__(self, seed=None, upgrades=None, horse_finish=HORSE_FINISH,
+                 clock=time.monotonic):
+        self.seed      = random.getrandbits(32) if seed is None else seed
+        rng = random.Random(self.seed)
+        self.economy   = Economy(upgrades, clock=clock)
+        self.blackjack = Blackjack(self.economy, rng)
+        self.race      = HorseRace(self.economy, rng, finish=horse_finish)
+        self.log       = None
+
+    def do(self, op, *args):
+        """ Applique l'action `op` (clé de OPS) et l'enregistre. """
+        t = self.economy._ms()
+        obj, meth = OPS[op]
+        res = getattr(getattr(self, obj), meth)(*args)
+        if self.log is not None:
+            self.log.append((t, op) + args)
+        return res
+
+    def summary(self):
+        """ État comparable entre une session et son rejeu. """
+        eco = self.economy
+        return {"cookies": eco.cookies,
+                "counts":  [u.count for u in eco.upgrades]}
+
+
+def simulate_session(seed, clicks=200, hands=20, races=5):
+    """ Session type jouée sans affichage ; renvoie le solde final. """
+    rng = random.Random(seed)   # choix du « joueur »
+    now = [0.0]   # horloge virtuelle : une minute de jeu par auto-clic
+    g = GameState(seed, clock=lambda: now[0])
+    eco, bj, race = g.economy, g.blackjack, g.race
+    g.do("click", clicks)
+    for idx in range(len(eco.upgrades)):
+        while g.do("buy", idx) and eco.cookies > 50:
+            pass
+        now[0] += 60
+        eco.settle()
+    for _ in range(hands):
+        g.do("bet", 5)
+        while bj.in_round and bj.player.total < 17:
+            g.do("hit")
+        if bj.in_round:
+            g.do("stand")
+    for _ in range(races):
+        if eco.cookies <= 0:
+            break
+        g.do("race", rng.randint(1, race.count), min(10, eco.cookies))
+        while race.running:
+            g.do("step")
+    return eco.cookies
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    t0 = time.perf_counter()
+    for seed in range(n):
+        simulate_session(seed)
+    dt = time.perf_counter() - t0
+    print(f"{n} sessions en {dt:.2f}s ({n/dt:,.0f} sessions/s)")
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Résolution des flux YouTube hors du thread Tk :
+- pool de workers qui appellent yt_dlp en arrière-plan,
+- résultats (et événements VLC, via post()) rendus au thread Tk par
+  une queue thread-safe vidée dans poll() ; pending() dit s'il reste
+  quelque chose à relever, le thread Tk ne sonde que dans ce cas,
+- cache disque des URL résolues (clé = URL + format), valable
+  jusqu'à l'expiration de l'URL signée,
+- cache local des médias téléchargés (LRU borné en taille) pour jouer
+  hors ligne après le premier lancement,
+- une seule instance libvlc par process et un pool de lecteurs
+  réutilisables (PlayerPool),
+- images redimensionnées une fois puis gardées en PNG (lisibles par
+  tk.PhotoImage sans PIL), clé = source + date de modification + taille.
+"""
+import os
+import json
+import shutil
+import hashlib
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+# dossier de cache (LOCALAPPDATA sous Windows, ~/.cache ailleurs)
+CACHE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache"),
+    "compteur-argent"
+)
+STREAM_CACHE_FILE = os.path.join(CACHE_DIR, "streams.json")
+MEDIA_CACHE_DIR   = os.path.join(CACHE_DIR, "media")
+MEDIA_CACHE_MAX   = 500 * 1024 * 1024   # octets
+THUMB_DIR         = os.path.join(CACHE_DIR, "thumbs")
+
+STREAM_TTL_DEFAULT = 30 * 60   # durée de vie si l'URL n'indique rien (s)
+STREAM_TTL_MARGIN  = 5 * 60    # marge avant l'expiration réelle (s)
+RESOLVE_WORKERS    = 2
+
+VLC_ARGS         = ['--no-video-title-show']
+PLAYER_POOL_SIZE = 3   # lecteurs gardés au repos pour réutilisation
+
+
+def url_expiry(url, now=None):
+    """ Timestamp d'expiration d'une URL signée (param `expire`). """
+    now = time.time() if now is None else now
+    parsed = urlparse(url)
+    exp = parse_qs(parsed.query).get("expire", [None])[0]
+    if exp is None:
+        # format googlevideo "…/expire/1700000000/…"
+        parts = parsed.path.split("/")
+        if "expire" in parts and parts.index("expire") + 1 < len(parts):
+            exp = parts[parts.index("expire") + 1]
+    try:
+        return int(exp) - STREAM_TTL_MARGIN
+    except (TypeError, ValueError):
+        return now + STREAM_TTL_DEFAULT
+
+
+def ytdlp_extract(url, fmt):
+    """ Extracteur par défaut : info yt_dlp sans téléchargement. """
+    from yt_dlp import YoutubeDL
+    with YoutubeDL({"format": fmt, "quiet": True}) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def ytdlp_download(url, fmt, dest, cancel=None):
+    """
+    Téléchargeur par défaut : yt_dlp vers dest.<ext>, renvoie le chemin.
+    Interrompu au prochain bloc reçu si l'Event `cancel` est levé.
+    """
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadCancelled
+
+    def hook(_progress):
+        if cancel is not None and cancel.is_set():
+            raise DownloadCancelled("fermeture de l'overlay")
+
+    opts = {"format": fmt, "quiet": True, "outtmpl": dest + ".%(ext)s",
+            "progress_hooks": [hook]}
+    with YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+        return ydl.prepare_filename(info)
+
+
+def _thumb_key(path):
+    """ Préfixe propre à la source + suffixe propre à sa version. """
+    src = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    return src, f"{src}-{os.stat(path).st_mtime_ns}"
+
+
+def _prune_thumbs(root, src, key):
+    """ Supprime les vignettes d'anciennes versions de la source. """
+    for name in os.listdir(root):
+        current = name.startswith((key + "-", key + "."))
+        if name.startswith(src + "-") and not current:
+            try:
+                os.remove(os.path.join(root, name))
+            except OSError:
+                pass
+
+
+def image_size(path, root=THUMB_DIR):
+    """
+    (largeur, hauteur) de l'image `path`, mémorisée dans le cache :
+    PIL n'est importé que si la source est nouvelle ou a changé.
+    """
+    src, key = _thumb_key(path)
+    meta = os.path.join(root, key + ".json")
+    try:
+        with open(meta, encoding="utf-8") as f:
+            return tuple(json.load(f))
+    except (OSError, ValueError):
+        pass
+    from PIL import Image
+    with Image.open(path) as img:
+        size = img.size
+    os.makedirs(root, exist_ok=True)
+    _prune_thumbs(root, src, key)
+    with open(meta, "w", encoding="utf-8") as f:
+        json.dump(list(size), f)
+    return size
+
+
+def thumbnail(path, size, root=THUMB_DIR):
+    """
+    Chemin d'une copie PNG de `path` redimensionnée à `size` (LANCZOS),
+    calculée au premier appel pour cette version de la source et cette
+    taille, puis relue telle quelle.
+    """
+    w, h = size
+    src, key = _thumb_key(path)
+    dest = os.path.join(root, f"{key}-{w}x{h}.png")
+    if not os.path.exists(dest):
+        from PIL import Image
+        os.makedirs(root, exist_ok=True)
+        tmp = dest + ".tmp"
+        with Image.open(path) as img:
+            img.convert("RGB").resize((w, h), Image.LANCZOS).save(tmp, "PNG")
+        os.replace(tmp, dest)
+    return dest
+
+
+class LocalSource:
+    """
+    Remplaçant hors réseau de yt_dlp : les URL YouTube sont servies par
+    <root>/<id vidéo>.<ext>. extract / download s'injectent à la place
+    de ytdlp_extract / ytdlp_download.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _file(self, url):
+        vid = parse_qs(urlparse(url).query).get("v", [url])[0]
+        for name in os.listdir(self.root):
+            if name.rsplit(".", 1)[0] == vid:
+                return os.path.join(self.root, name)
+        raise FileNotFoundError(url)
+
+    def extract(self, url, fmt):
+        return {"url": self._file(url)}
+
+    def download(self, url, fmt, dest, cancel=None):
+        src = self._file(url)
+        path = dest + os.path.splitext(src)[1]
+        shutil.copyfile(src, path)
+        return path
+
+
+class MediaCache:
+    """
+    Médias téléchargés une fois dans un dossier borné à max_bytes.
+    Fichiers nommés d'après un hash de (format, URL) ; la date de
+    modification sert d'horodatage LRU (rafraîchie à chaque lecture).
+    """
+
+    def __init__(self, root=MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX,
+                 downloader=ytdlp_download):
+        self.root       = root
+        self.max_bytes  = max_bytes
+        self.downloader = downloader
+        self._lock      = threading.Lock()
+        self._pending   = set()
+        self._cancel    = threading.Event()   # levé par close()
+
+    @staticmethod
+    def _name(url, fmt):
+        return hashlib.sha1(f"{fmt}|{url}".encode()).hexdigest()[:20]
+
+    def _files(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        # ignore les téléchargements en cours de yt_dlp
+        return [os.path.join(self.root, n) for n in names
+                if not n.endswith((".part", ".ytdl", ".tmp"))]
+
+    def get(self, url, fmt):
+        """ Chemin local si déjà téléchargé (marqué comme récent), sinon None. """
+        name = self._name(url, fmt)
+        for path in self._files():
+            if os.path.basename(path).split(".", 1)[0] == name:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+        return None
+
+    def fetch(self, url, fmt):
+        """ Télécharge (bloquant, à appeler hors thread Tk) puis évince. """
+        key = self._name(url, fmt)
+        with self._lock:
+            if key in self._pending or self._cancel.is_set():
+                return None
+            self._pending.add(key)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            path = self.downloader(url, fmt, os.path.join(self.root, key),
+                                   cancel=self._cancel)
+            self._evict(keep=path)
+            return path
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def close(self):
+        """ Interrompt le téléchargement en cours et refuse les suivants. """
+        self._cancel.set()
+
+    @property
+    def closed(self):
+        return self._cancel.is_set()
+
+    def _evict(self, keep=None):
+        entries = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class StreamCache:
+    """ Cache disque {format|url: (url résolue, expiration)}. """
+
+    def __init__(self, path=STREAM_CACHE_FILE):
+        self.path  = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def key(url, fmt):
+        return f"{fmt}|{url}"
+
+    def get(self, url, fmt):
+        with self._lock:
+            ent = self._data.get(self.key(url, fmt))
+        if ent and ent["expire"] > time.time():
+            return ent["url"]
+        return None
+
+    def put(self, url, fmt, stream_url):
+        now = time.time()
+        with self._lock:
+            self._data[self.key(url, fmt)] = {
+                "url": stream_url, "expire": url_expiry(stream_url, now)
+            }
+            # purge des entrées expirées au passage
+            self._data = {k: v for k, v in self._data.items()
+                          if v["expire"] > now}
+            self._save()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[Warning] Cache flux non écrit : {e}")
+
+
+class StreamResolver:
+    """
+    Résout des URL YouTube sur un pool de threads.
+    Les callbacks sont toujours appelés depuis poll(), donc sur le
+    thread Tk : callback(stream_url) ou on_error(exc).
+    """
+
+    def __init__(self, extractor=ytdlp_extract, cache=None,
+                 workers=RESOLVE_WORKERS, media_cache=None):
+        self.extractor   = extractor
+        self.cache       = cache if cache is not None else StreamCache()
+        self.media_cache = media_cache
+        self.results     = queue.Queue()
+        self._inflight   = 0   # tâches du pool dont le résultat n'est pas posté
+        self._lock       = threading.Lock()
+        self._pool       = ThreadPoolExecutor(max_workers=workers,
+                                              thread_name_prefix="resolve")
+        # un seul téléchargement à la fois, sans bloquer les résolutions
+        self._downloads  = ThreadPoolExecutor(max_workers=1,
+                                              thread_name_prefix="download")
+
+    def resolve(self, url, fmt, callback, on_error=None):
+        cached = self.cache.get(url, fmt)
+        if cached:
+            self.post(callback, cached)
+            return
+        self.submit(self._extract, callback, url, fmt, on_error=on_error)
+
+    def submit(self, fn, callback, *args, on_error=None):
+        """ fn(*args) sur le pool, puis callback(résultat) au prochain poll(). """
+        with self._lock:
+            self._inflight += 1
+        self._pool.submit(self._work, fn, args, callback, on_error)
+
+    def resolve_local(self, url, fmt, callback, on_error=None):
+        """
+        Comme resolve(), mais sert le fichier du MediaCache s'il existe ;
+        sinon lit le flux distant et le télécharge pour les fois suivantes.
+        """
+        if self.media_cache is None:
+            return self.resolve(url, fmt, callback, on_error)
+        path = self.media_cache.get(url, fmt)
+        if path:
+            self.post(callback, path)
+            return
+        self.resolve(url, fmt, callback, on_error)
+        self._downloads.submit(self._download, url, fmt)
+
+    def _download(self, url, fmt):
+        try:
+            self.media_cache.fetch(url, fmt)
+        except Exception as e:
+            if not self.media_cache.closed:
+                print(f"[Warning] Téléchargement en cache échoué : {e}")
+
+    def _extract(self, url, fmt):
+        stream_url = self.extractor(url, fmt)["url"]
+        self.cache.put(url, fmt, stream_url)
+        return stream_url
+
+    def _work(self, fn, args, callback, on_error):
+        try:
+            self.post(callback, fn(*args))
+        except Exception as e:
+            self.post(on_error or self._warn, e)
+        finally:
+            # décompté après le post : pending() ne voit jamais de trou
+            with self._lock:
+                self._inflight -= 1
+
+    @staticmethod
+    def _warn(err):
+        print(f"[Warning] Résolution du flux échouée : {err}")
+
+    def post(self, fn, *args):
+        """ Programme fn(*args) sur le thread Tk (appelable de tout thread). """
+        self.results.put((fn, args))
+
+    def poll(self):
+        """ Vide la queue et appelle les callbacks (thread Tk). """
+        while True:
+            try:
+                fn, args = self.results.get_nowait()
+            except queue.Empty:
+                return
+            fn(*args)
+
+    def pending(self):
+        """ Vrai tant qu'un résultat est attendu ou reste dans la queue. """
+        return bool(self._inflight) or not self.results.empty()
+
+    def shutdown(self):
+        """ Fermeture : tâches en file annulées, téléchargement interrompu. """
+        if self.media_cache is not None:
+            self.media_cache.close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._downloads.shutdown(wait=False, cancel_futures=True)
+
+
+class PlayerPool:
+    """
+    Moteur VLC partagé : une instance libvlc, des MediaPlayer recyclés.
+    Les Media sont relâchés dès qu'ils sont confiés au lecteur (qui
+    garde sa propre référence), donc rien ne s'accumule d'un cycle à
+    l'autre. live_instances / live_players servent au debug.
+    """
+    live_instances = 0
+    live_players   = 0
+
+    def __init__(self, args=VLC_ARGS, size=PLAYER_POOL_SIZE):
+        import vlc
+        self.vlc       = vlc
+        self.instance  = vlc.Instance(args)
+        self.size      = size
+        self._free     = []
+        self._attached = {}
+        PlayerPool.live_instances += 1
+
+    def acquire(self):
+        if self._free:
+            return self._free.pop()
+        PlayerPool.live_players += 1
+        return self.instance.media_player_new()
+
+    def load(self, player, url, *options):
+        """ Confie un nouveau Media au lecteur et relâche notre référence. """
+        media = self.instance.media_new(url, *options)
+        player.set_media(media)
+        media.release()
+
+    def attach(self, player, event_type, fn):
+        player.event_manager().event_attach(event_type, fn)
+        self._attached.setdefault(id(player), set()).add(event_type)
+
+    def release(self, player):
+        """ Arrête le lecteur et le remet au pool (ou le détruit si plein). """
+        ev = player.event_manager()
+        for event_type in self._attached.pop(id(player), ()):
+            ev.event_detach(event_type)
+        player.stop()
+        player.set_media(None)
+        if len(self._free) < self.size:
+            self._free.append(player)
+        else:
+            player.release()
+            PlayerPool.live_players -= 1
+
+    def stats(self):
+        return {"instances": PlayerPool.live_instances,
+                "players":   PlayerPool.live_players,
+                "idle":      len(self._free)}
+
+    def close(self):
+        for player in self._free:
+            player.release()
+            PlayerPool.live_players -= 1
+        self._free = []
+        self.instance.release()
+        PlayerPool.live_instances -= 1
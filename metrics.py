@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Point de collecte local de l'overlay, activé par COMPTEUR_METRICS
+(« 1 » pour le port METRICS_PORT, ou un numéro de port) :
+- serveur HTTP asyncio sur son propre thread, lié à 127.0.0.1,
+- GET /metrics : exposition texte Prometheus,
+  GET /metrics.json : instantané JSON,
+- le thread Tk publie une fois par tick un dict neuf (publish()) ; le
+  serveur ne lit que la dernière référence publiée, sans verrou, et
+  met en cache le rendu de chaque instantané : une collecte ne coûte
+  rien au thread Tk, cent collectes du même tick un seul rendu.
+`python metrics.py --bench [requêtes] [connexions]` : test de charge.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+
+METRICS        = os.environ.get("COMPTEUR_METRICS")
+METRICS_HOST   = "127.0.0.1"
+METRICS_PORT   = int(METRICS) if METRICS and METRICS.isdigit() and METRICS != "1" else 9464
+METRICS_PREFIX = "compteur_"
+
+# nom → (type, aide) ; clé de l'instantané identique au nom sans préfixe
+METRIC_HELP = {
+    "salary_earned":     ("gauge",   "Salaire gagné depuis le début de journée"),
+    "clicks_total":      ("counter", "Clics sur le cookie depuis le lancement"),
+    "cookies":           ("gauge",   "Solde de cookies"),
+    "upgrades":          ("gauge",   "Auto-clics possédés"),
+    "game_rounds_total": ("counter", "Parties jouées depuis le lancement"),
+    "game_net_cookies":  ("gauge",   "Gain net en cookies depuis le lancement"),
+    "loop_lag_seconds":  ("gauge",   "Retard du dernier réveil de la boucle Tk"),
+    "tk_commands_per_second": ("gauge", "Commandes Tk envoyées par seconde"),
+    "eco_mode":          ("gauge",   "1 en mode économie"),
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus(snap):
+    """
+    Texte Prometheus d'un instantané : valeurs simples, ou listes de
+    (labels, valeur) pour les séries étiquetées.
+    """
+    lines = []
+    for name, (kind, help_) in METRIC_HELP.items():
+        if name not in snap:
+            continue
+        full = METRICS_PREFIX + name
+        lines.append(f"# HELP {full} {help_}")
+        lines.append(f"# TYPE {full} {kind}")
+        value = snap[name]
+        series = value if isinstance(value, list) else [({}, value)]
+        for labels, v in series:
+            lines.append(f"{full}{_labels(labels)} {float(v)!r}")
+    return "\n".join(lines) + "\n"
+
+
+def render_json(snap):
+    """ JSON d'un instantané, séries étiquetées en [{label…, "value"}]. """
+    return json.dumps({k: [dict(labels, value=v) for labels, v in val]
+                       if isinstance(val, list) else val
+                       for k, val in snap.items()}, ensure_ascii=False)
+
+
+class MetricsServer:
+    """ publish(dict) depuis le thread Tk ; le serveur tourne à côté. """
+
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT):
+        self.host    = host
+        self.port    = port
+        self.scrapes = 0
+        self._snap   = ({"t": time.time()}, None, None)   # (dict, texte, json)
+        self._loop   = asyncio.new_event_loop()
+        self._server = None
+        self._ready  = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True,
+                                        name="metrics")
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def publish(self, snap):
+        """ Thread Tk : remplace l'instantané (une affectation, sans verrou). """
+        self._snap = (snap, None, None)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    # -- thread serveur --
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(asyncio.start_server(
+                self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"[Warning] Métriques désactivées : {e}")
+            return
+        finally:
+            self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def _body(self, path):
+        snap, text, js = self._snap
+        if path == "/metrics":
+            if text is None:
+                text = render_prometheus(snap)
+                self._snap = (snap, text, js) if self._snap[0] is snap else self._snap
+            return "200 OK", "text/plain; version=0.0.4; charset=utf-8", text
+        if path == "/metrics.json":
+            if js is None:
+                js = render_json(snap)
+                self._snap = (snap, text, js) if self._snap[0] is snap else self._snap
+            return "200 OK", "application/json", js
+        return "404 Not Found", "text/plain", "not found\n"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:   # keep-alive : plusieurs requêtes par connexion
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode("latin-1").split()
+                close = False
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    if h.lower().startswith(b"connection:") and b"close" in h.lower():
+                        close = True
+                if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+                    status, ctype, body = "405 Method Not Allowed", "text/plain", ""
+                else:
+                    status, ctype, body = self._body(parts[1].split("?")[0])
+                data = body.encode("utf-8")
+                head = (f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+                writer.write(head.encode("latin-1")
+                             + (data if parts and parts[0] != "HEAD" else b""))
+                await writer.drain()
+                self.scrapes += 1
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# -- test de charge --
+async def _client(host, port, n, lat):
+    reader, writer = await asyncio.open_connection(host, port)
+    req = f"GET /metrics HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        writer.write(req)
+        await writer.drain()
+        length = 0
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b""):
+                break
+            if h.lower().startswith(b"content-length:"):
+                length = int(h.split(b":")[1])
+        await reader.readexactly(length)
+        lat.append(time.perf_counter() - t0)
+    writer.close()
+
+
+def benchmark(requests=5000, conns=20, tick_ms=100):
+    srv = MetricsServer(port=0).start()
+    stop = threading.Event()
+    pub_cost = []
+
+    def ticker():   # simule le thread Tk : un instantané par tick
+        k = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            srv.publish({"t": time.time(), "salary_earned": k * 0.083,
+                         "clicks_total": k, "cookies": k,
+                         "upgrades": [({"emoji": "🍓"}, 3), ({"emoji": "🐌"}, 1)],
+                         "game_net_cookies": [({"game": "blackjack"}, -k)],
+                         "loop_lag_seconds": 0.001})
+            pub_cost.append(time.perf_counter() - t0)
+            k += 1
+            stop.wait(tick_ms / 1000)
+
+    threading.Thread(target=ticker, daemon=True).start()
+    lat = []
+
+    async def run():
+        per = requests // conns
+        await asyncio.gather(*(_client(srv.host, srv.port, per, lat)
+                               for _ in range(conns)))
+
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    dt = time.perf_counter() - t0
+    stop.set()
+    srv.close()
+    lat.sort()
+    print(f"{len(lat):,} collectes sur {conns} connexions en {dt:.2f}s "
+          f"({len(lat)/dt:,.0f}/s), latence p50 {lat[len(lat)//2]*1000:.2f} ms "
+          f"p99 {lat[int(len(lat)*0.99)]*1000:.2f} ms")
+    print(f"publish() côté Tk : {sum(pub_cost)/len(pub_cost)*1e6:.2f} µs/tick")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(*(int(a) for a in sys.argv[2:4]))
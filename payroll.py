@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calendrier de paie du compteur de salaire :
+- règles de postes lues dans shifts.json (à côté du script) : taux
+  horaire, postes par jour de semaine, pauses non payées, majoration
+  de nuit, heures supplémentaires au-delà d'un quota journalier,
+- compilées en une table linéaire par morceaux triée (instants de
+  rupture, taux par seconde, sommes préfixes),
+- « gagné depuis le début » = deux recherches bisect, quel que soit
+  le nombre de jours couverts (table étendue au besoin),
+- horloge murale avancée par time.monotonic : un changement d'heure
+  système ne fait pas sauter le compteur.
+Sans fichier : un poste continu 00:00–24:00 tous les jours, soit
+l'ancien calcul taux × temps écoulé.
+
+Format de shifts.json (jours : 0 = lundi … 6 = dimanche) :
+  {"rate": 3000,
+   "shifts":   [{"days": [0,1,2,3,4], "start": "08:00", "end": "17:00"}],
+   "breaks":   [{"days": [0,1,2,3,4], "start": "12:00", "end": "13:00"}],
+   "night":    {"start": "22:00", "end": "06:00", "mult": 1.25},
+   "overtime": {"daily_h": 8, "mult": 1.5}}
+Un poste dont la fin précède le début se termine le lendemain.
+`python payroll.py` compile dix ans de règles et mesure les requêtes.
+"""
+import os
+import sys
+import json
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+
+SHIFTS_PATH  = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "shifts.json")
+HORIZON_DAYS = 366   # jours compilés d'avance, table étendue au-delà
+DAY          = 24 * 3600
+ALL_DAYS     = list(range(7))
+
+
+def load_shifts(rate, path=SHIFTS_PATH):
+    """ Règles du fichier, ou poste continu au taux `rate` (€/h). """
+    try:
+        with open(path, encoding="utf-8") as f:
+            rules = json.load(f)
+    except (OSError, ValueError):
+        rules = {"shifts": [{"start": "00:00", "end": "24:00"}]}
+    rules.setdefault("rate", rate)
+    return rules
+
+
+def _secs(hhmm):
+    h, m = hhmm.split(":")
+    return int(h) * 3600 + int(m) * 60
+
+
+def _at(day, secs):
+    """
+    Epoch de l'heure murale `secs` (« HH:MM » en secondes) du jour `day`,
+    heure locale ; 24:00 et au-delà tombent le lendemain. La date est
+    construite avant mktime : jamais de secondes débordant d'un jour de
+    23 ou 25 heures (changement d'heure).
+    """
+    extra, secs = divmod(secs, DAY)
+    day = day + timedelta(days=extra)
+    h, rem = divmod(secs, 3600)
+    return time.mktime((day.year, day.month, day.day, h, rem // 60, rem % 60,
+                        0, 0, -1))
+
+
+def _windows(rules, day):
+    """ [(début, fin)] epoch des créneaux `rules` qui commencent ce jour. """
+    out = []
+    for r in rules:
+        if day.weekday() in r.get("days", ALL_DAYS):
+            s, e = _secs(r["start"]), _secs(r["end"])
+            end = _at(day, e) if e > s else _at(day + timedelta(days=1), e)
+            out.append((_at(day, s), end))
+    return sorted(out)
+
+
+def _subtract(span, holes):
+    """ Morceaux de `span` hors des intervalles `holes` (triés). """
+    a, b = span
+    out = []
+    for hs, he in holes:
+        if he <= a or hs >= b:
+            continue
+        if hs > a:
+            out.append((a, hs))
+        a = max(a, he)
+    if a < b:
+        out.append((a, b))
+    return out
+
+
+class PaySchedule:
+    """
+    earned(debut, fin) : montant gagné entre deux instants epoch.
+    Table : times[i] → taux rates[i] (€/s) jusqu'à times[i+1],
+    cum[i] = gagné entre times[0] et times[i].
+    """
+
+    def __init__(self, rules, horizon_days=HORIZON_DAYS):
+        self.rules   = rules
+        self.base    = rules["rate"] / 3600.0
+        self.horizon = horizon_days * DAY
+        self.times   = []
+        self.rates   = []
+        self.cum     = []
+        self.t0 = self.t1 = None
+
+    # -- compilation --
+    def _pieces(self, day):
+        """ (début, fin, €/s) payés pour les postes commençant ce jour. """
+        r = self.rules
+        night, ot = r.get("night"), r.get("overtime")
+        breaks = sorted(_windows(r.get("breaks", ()), day)
+                        + _windows(r.get("breaks", ()), day + timedelta(1)))
+        nights = []
+        if night:
+            spec = [night]
+            for k in (-1, 0, 1):
+                nights += _windows(spec, day + timedelta(k))
+        limit  = ot["daily_h"] * 3600 if ot else None
+        worked = 0.0
+        for span in _windows(r["shifts"], day):
+            for a, b in _subtract(span, breaks):
+                cuts = {a, b}
+                cuts.update(t for w in nights for t in w if a < t < b)
+                if limit is not None and a < a + limit - worked < b:
+                    cuts.add(a + limit - worked)
+                pts = sorted(cuts)
+                for x, y in zip(pts, pts[1:]):
+                    mid, rate = (x + y) / 2, self.base
+                    if any(ns <= mid < ne for ns, ne in nights):
+                        rate *= night["mult"]
+                    if limit is not None and worked + (x - a) >= limit:
+                        rate *= ot["mult"]
+                    yield x, y, rate
+                worked += b - a
+
+    def compile(self, t0, t1):
+        """ Table couvrant au moins [t0, t1]. """
+        deltas = {}
+        day = date.fromtimestamp(t0) - timedelta(1)   # postes de la veille
+        while _at(day, 0) <= t1:
+            for a, b, rate in self._pieces(day):
+                deltas[a] = deltas.get(a, 0.0) + rate
+                deltas[b] = deltas.get(b, 0.0) - rate
+            day += timedelta(1)
+        times, rates, cur = [], [], 0.0
+        for t in sorted(deltas):
+            cur = round(cur + deltas[t], 12)
+            if rates and rates[-1] == cur:
+                continue   # rupture sans changement de taux
+            times.append(t)
+            rates.append(cur)
+        if not times:
+            times, rates = [t0], [0.0]
+        spans = (r * (b - a) for a, b, r in zip(times, times[1:], rates))
+        self.times = times
+        self.rates = rates
+        self.cum   = list(accumulate(spans, initial=0.0))
+        self.t0, self.t1 = t0, _at(day, 0)
+
+    # -- requêtes --
+    def _total(self, t):
+        i = bisect_right(self.times, t) - 1
+        if i < 0:
+            return 0.0
+        return self.cum[i] + self.rates[i] * (t - self.times[i])
+
+    def earned(self, start, now):
+        if self.t0 is None or start < self.t0 or now >= self.t1:
+            t0 = start if self.t0 is None else min(start, self.t0)
+            self.compile(t0, max(now, start) + self.horizon)
+        return self._total(now) - self._total(start)
+
+    def rate_at(self, t):
+        """ Taux horaire en vigueur à l'instant t (0 hors poste). """
+        i = bisect_right(self.times, t) - 1
+        return self.rates[i] * 3600 if i >= 0 else 0.0
+
+
+class WallClock:
+    """ time.time() lu au lancement, puis avancé par time.monotonic. """
+
+    def __init__(self):
+        self.wall0 = time.time()
+        self.mono0 = time.monotonic()
+
+    def __call__(self):
+        return self.wall0 + (time.monotonic() - self.mono0)
+
+
+def benchmark(years=10, queries=1_000_000):
+    rules = {"rate": 3000,
+             "shifts": [{"days": [0, 1, 2, 3, 4], "start": "08:00", "end": "18:30"},
+                        {"days": [5], "start": "21:00", "end": "05:00"}],
+             "breaks": [{"days": [0, 1, 2, 3, 4], "start": "12:00", "end": "13:00"}],
+             "night": {"start": "22:00", "end": "06:00", "mult": 1.25},
+             "overtime": {"daily_h": 8, "mult": 1.5}}
+    pay = PaySchedule(rules, horizon_days=365 * years)
+    start = time.time()
+    t0 = time.perf_counter()
+    pay.compile(start, start + 365 * years * DAY)
+    dt_c = time.perf_counter() - t0
+    step = 365 * years * DAY / queries
+    t0 = time.perf_counter()
+    for k in range(queries):
+        pay.earned(start, start + k * step)
+    dt_q = time.perf_counter() - t0
+    print(f"{years} ans compilés en {dt_c*1000:.0f} ms "
+          f"({len(pay.times):,} ruptures)")
+    print(f"{queries:,} requêtes en {dt_q:.2f}s "
+          f"({dt_q/queries*1e6:.2f} µs/requête)")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
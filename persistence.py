@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sauvegarde de la partie résistante aux plantages :
+- instantané compact (state.json) réécrit périodiquement de façon atomique,
+- journal en ajout seul (journal.log) : achats et paris écrits et fsync'd
+  tout de suite, variations de cookies regroupées (un enregistrement par
+  flush, pas un par clic) et simplement écrites : au pire la dernière
+  seconde de clics est perdue si la machine s'arrête net, sans fsync
+  périodique sur le thread Tk,
+- au démarrage : instantané + rejeu du journal, puis crédit du revenu
+  des auto-clics gagné pendant que l'overlay était fermé.
+Chaque enregistrement porte le solde absolu et un numéro de séquence,
+le rejeu est donc idempotent.
+"""
+import os
+import json
+import time
+
+STATE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.local/share"),
+    "compteur-argent"
+)
+SNAPSHOT_MS = 60 * 1000   # compaction journal → instantané
+FLUSH_MS    = 1000        # regroupement des variations de cookies
+
+
+def _fsync_write(f, data, sync=True):
+    f.write(data)
+    f.flush()
+    if sync:
+        os.fsync(f.fileno())
+
+
+class Store:
+    """
+    Branché sur un engine.GameState via attach() ; flush() et snapshot()
+    sont appelés par l'ordonnanceur de l'overlay.
+    """
+
+    def __init__(self, root=STATE_DIR, clock=time.time):
+        self.root     = root
+        self.clock    = clock
+        self.snap     = os.path.join(root, "state.json")
+        self.log_path = os.path.join(root, "journal.log")
+        self.seq      = 0
+        self.start    = None   # début de la journée de salaire (epoch)
+        self._dirty   = False
+        self._game    = None
+        self._log     = None
+
+    # -- chargement --
+    def load(self):
+        """ Instantané + journal rejoué → dict d'état, ou None. """
+        state = None
+        try:
+            with open(self.snap, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self.log_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break   # dernière ligne tronquée par un plantage
+            if state is None:
+                state = {"seq": 0, "cookies": 0, "counts": [], "start": None}
+            if rec["seq"] <= state["seq"]:
+                continue
+            if rec["op"] == "buy":
+                counts = state["counts"]
+                counts.extend([0] * (rec["idx"] + 1 - len(counts)))
+                counts[rec["idx"]] += 1
+            if rec["op"] == "start":
+                state["start"] = rec["start"]
+            state["cookies"] = rec["cookies"]
+            state["seq"]     = rec["seq"]
+            state["t"]       = rec["t"]
+        return state
+
+    def restore(self, game, start):
+        """
+        Applique l'état sauvegardé à `game` et renvoie l'heure de début
+        du compteur de salaire (reprise si même jour, sinon `start`).
+        """
+        state = self.load()
+        self.start = start
+        if state:
+            self.seq = state["seq"]
+            eco = game.economy
+            for up, n in zip(eco.upgrades, state["counts"]):
+                up.count = n
+            eco.recompute_rate()
+            eco.cookies = state["cookies"]
+            # revenu des auto-clics gagné pendant l'arrêt
+            offline = max(0.0, self.clock() - state.get("t", self.clock()))
+            if offline and eco.rate:
+                eco.add(int(eco.rate * offline))
+            saved = state.get("start")
+            if saved and time.localtime(saved)[:3] == time.localtime(start)[:3]:
+                self.start = saved
+        self.attach(game)
+        self._append({"op": "start", "start": self.start}, sync=False)
+        return self.start
+
+    # -- écriture --
+    def attach(self, game):
+        self._game = game
+        game.economy.subscribe(self._on_economy)
+        game.blackjack.subscribe(self._on_bet)
+        game.race.subscribe(self._on_bet)
+
+    def _on_economy(self, event, *args):
+        if event == "cookies":
+            self._dirty = True   # écrit au prochain flush()
+        elif event == "upgrade":
+            self._append({"op": "buy", "idx": args[0]})
+
+    def _on_bet(self, event, *args):
+        if event == "bet":
+            self._append({"op": "bet", "game": "blackjack", "amt": args[0]})
+        elif event == "start":
+            self._append({"op": "bet", "game": "horses",
+                          "amt": self._game.race.stake})
+
+    def _append(self, rec, sync=True):
+        if self._log is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self.seq += 1
+        rec.update(seq=self.seq, t=self.clock(),
+                   cookies=self._game.economy.cookies)
+        _fsync_write(self._log, json.dumps(rec, ensure_ascii=False) + "\n", sync)
+        self._dirty = False
+
+    def flush(self):
+        if self._dirty:
+            self._append({"op": "cookies"}, sync=False)
+
+    def snapshot(self):
+        """ Écrit l'instantané complet puis vide le journal. """
+        eco = self._game.economy
+        self.flush()
+        state = {"seq": self.seq, "t": self.clock(), "start": self.start,
+                 "cookies": eco.cookies,
+                 "counts": [u.count for u in eco.upgrades]}
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.snap + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            _fsync_write(f, json.dumps(state))
+        os.replace(tmp, self.snap)
+        # le journal n'apporte plus rien : seq <= instantané
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+
+    def close(self):
+        if self._game is not None:
+            self.snapshot()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
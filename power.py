@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mode économie de l'overlay :
+- « actif » tant que quelqu'un est là et que la fenêtre est visible,
+- « éco » après IDLE_MS sans saisie (toute la session sous Windows via
+  GetLastInputInfo, donc aussi écran verrouillé ; saisies dans
+  l'overlay ailleurs) ou quand la fenêtre est masquée / recouverte,
+- durée et temps CPU du process (threads libvlc compris) cumulés par
+  mode, pour mesurer le gain (report()).
+La vue s'abonne aux changements de mode ("mode", nom) et ralentit ou
+met en pause ce qui ne sert à rien quand personne ne regarde.
+"""
+import sys
+import time
+
+from engine import Observable
+
+IDLE_MS       = 60 * 1000   # sans saisie au-delà : mode éco
+POWER_POLL_MS = 1000        # vérification du délai d'inactivité
+ACTIVE, ECO   = "actif", "éco"
+
+if sys.platform.startswith("win"):
+    import ctypes
+
+    class _LastInputInfo(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    def system_idle_ms():
+        """ ms depuis la dernière saisie de la session Windows. """
+        info = _LastInputInfo(ctypes.sizeof(_LastInputInfo), 0)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        return (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+else:
+    def system_idle_ms():
+        return None   # seules les saisies dans l'overlay sont connues
+
+
+class PowerMonitor(Observable):
+    """
+    touch() à chaque saisie, set_hidden() sur les événements de
+    visibilité, update() périodiquement pour le délai d'inactivité.
+    """
+
+    def __init__(self, idle_ms=IDLE_MS, clock=time.monotonic,
+                 cpu=time.process_time, idle_probe=system_idle_ms):
+        super().__init__()
+        self.idle_ms    = idle_ms
+        self.clock      = clock
+        self.cpu        = cpu
+        self.idle_probe = idle_probe
+        self.mode       = ACTIVE
+        self.hidden     = False
+        self.totals     = {ACTIVE: [0.0, 0.0], ECO: [0.0, 0.0]}  # [s, CPU s]
+        self._input     = clock()
+        self._since     = clock()
+        self._cpu0      = cpu()
+
+    def idle_ms_now(self):
+        local = (self.clock() - self._input) * 1000
+        system = self.idle_probe()
+        return local if system is None else min(local, system)
+
+    def touch(self):
+        self._input = self.clock()
+        if self.mode is ECO:
+            self.update()
+
+    def set_hidden(self, hidden):
+        if hidden != self.hidden:
+            self.hidden = hidden
+            self.update()
+
+    def update(self):
+        idle = self.hidden or self.idle_ms_now() >= self.idle_ms
+        mode = ECO if idle else ACTIVE
+        if mode is not self.mode:
+            self._account()
+            self.mode = mode
+            self._emit("mode", mode)
+
+    def _account(self):
+        now, cpu = self.clock(), self.cpu()
+        tot = self.totals[self.mode]
+        tot[0] += now - self._since
+        tot[1] += cpu - self._cpu0
+        self._since, self._cpu0 = now, cpu
+
+    def report(self):
+        """ Durée, CPU et charge moyenne par mode depuis le lancement. """
+        self._account()
+        parts = []
+        for mode, (wall, cpu) in self.totals.items():
+            load = cpu / wall * 100 if wall else 0.0
+            parts.append(f"{mode} {wall:.0f} s, CPU {cpu:.2f} s ({load:.1f} %)")
+        return " · ".join(parts)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation de la boucle Tk, activée par COMPTEUR_PROFILE
+(« 1 » ou chemin du fichier JSON d'export) :
+- retard de la boucle : écart entre l'échéance prévue d'un réveil de
+  l'ordonnanceur et son exécution réelle,
+- durée de chaque callback périodique, par nom,
+- jauges (dernière valeur) : commandes Tk/s…
+en histogrammes à seaux logarithmiques (µs). Désactivée, l'ordonnanceur
+ne garde qu'un test `if profiler` par réveil.
+"""
+import os
+import json
+import time
+
+from persistence import STATE_DIR
+
+PROFILE      = os.environ.get("COMPTEUR_PROFILE")
+PROFILE_FILE = (PROFILE if PROFILE and PROFILE != "1"
+                else os.path.join(STATE_DIR, "profile.json"))
+EXPORT_MS    = 10 * 1000
+BUCKETS      = 25   # seau i : durées < 2**i µs (dernier seau : au-delà)
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0]*BUCKETS
+        self.n      = 0
+        self.total  = 0.0
+        self.max    = 0.0
+
+    def add(self, seconds):
+        us = int(seconds * 1e6)
+        self.counts[min(us.bit_length(), BUCKETS-1)] += 1
+        self.n     += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """ Borne haute (ms) du seau contenant le quantile q. """
+        if not self.n:
+            return 0.0
+        rank, acc = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank:
+                return min((1 << i) / 1000.0, self.max * 1000)
+        return self.max * 1000
+
+    def to_dict(self):
+        return {
+            "count":   self.n,
+            "mean_ms": self.total / self.n * 1000 if self.n else 0.0,
+            "p50_ms":  self.percentile(0.50),
+            "p95_ms":  self.percentile(0.95),
+            "p99_ms":  self.percentile(0.99),
+            "max_ms":  self.max * 1000,
+        }
+
+
+class Profiler:
+    def __init__(self, path=PROFILE_FILE):
+        self.path      = path
+        self.loop_lag  = Histogram()
+        self.callbacks = {}
+        self.gauges    = {}
+        self.started   = time.monotonic()
+
+    def lag(self, seconds):
+        self.loop_lag.add(max(0.0, seconds))
+
+    def timed(self, name, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            hist = self.callbacks.get(name)
+            if hist is None:
+                hist = self.callbacks[name] = Histogram()
+            hist.add(time.perf_counter() - t0)
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def stats(self):
+        return {
+            "uptime_s":  time.monotonic() - self.started,
+            "loop_lag":  self.loop_lag.to_dict(),
+            "callbacks": {k: h.to_dict()
+                          for k, h in sorted(self.callbacks.items())},
+            "gauges":    dict(sorted(self.gauges.items())),
+        }
+
+    def export(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.stats(), f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[Warning] Profil non exporté : {e}")
+
+    def report(self):
+        """ Résumé texte (panneau de debug). """
+        lines = []
+        for name, h in [("boucle Tk (retard)", self.loop_lag)] + sorted(
+                self.callbacks.items()):
+            d = h.to_dict()
+            lines.append(f"{name:<28} n={d['count']:<7} "
+                         f"p50={d['p50_ms']:.2f} p99={d['p99_ms']:.2f} "
+                         f"max={d['max_ms']:.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calculatrice Pythagore par lots : normes euclidiennes de vecteurs de
+dimension quelconque.
+- liste collée (une ligne par vecteur, composantes séparées par
+  espaces, virgules ou points-virgules) ou fichier CSV,
+- normes calculées d'un bloc avec NumPy (hypot en 2D, linalg.norm
+  au-delà ; math.hypot si NumPy manque), vecteurs plus courts
+  complétés par des zéros,
+- CSV lu par blocs de CHUNK_ROWS lignes et réécrit avec une colonne
+  `norm` : mémoire bornée quelle que soit la taille du fichier ; un
+  fichier de sortie existant n'est remplacé que sur demande explicite,
+- résultats récents gardés dans un cache LRU (texte collé par empreinte,
+  fichier par chemin, taille et date de modification).
+La paire a, b de l'overlay reste le raccourci : math.hypot(a, b).
+`python pythagore.py fichier.csv [sortie.csv]` (sortie nommée : remplacée
+si elle existe) · `--bench [lignes]`
+"""
+import os
+import re
+import sys
+import csv
+import math
+import time
+import hashlib
+import tempfile
+import itertools
+import threading
+from collections import OrderedDict
+
+from engine import load_numpy
+
+CALC_CACHE = 32       # lots gardés en mémoire (LRU)
+CHUNK_ROWS = 65536    # lignes CSV par bloc
+NORM_COL   = "norm"
+
+_SPLIT = re.compile(r"[\s,;]+")
+_SEPS  = str.maketrans(",;", "  ")   # liste collée → séparateur blanc de loadtxt
+
+
+class LRU:
+    """ Dictionnaire borné : get() rafraîchit, put() évince le plus ancien. """
+
+    def __init__(self, maxsize=CALC_CACHE):
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()   # lots CSV sur un thread à part
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_text_cache = LRU()
+_csv_cache  = LRU()
+
+
+def parse_vectors(text):
+    """ [(x, y, …)] d'une liste collée ; lignes vides et « # » ignorées. """
+    rows = []
+    for no, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            rows.append([float(x) for x in _SPLIT.split(line) if x])
+        except ValueError:
+            raise ValueError(f"ligne {no} : {line[:30]!r}") from None
+    return rows
+
+
+def norms(rows):
+    """ Normes d'une liste de vecteurs (tableau NumPy, ou liste). """
+    numpy = load_numpy()
+    if numpy is None:
+        return [math.hypot(*r) for r in rows]
+    if not rows:
+        return numpy.empty(0)
+    dim = max(map(len, rows))
+    if all(len(r) == dim for r in rows):
+        a = numpy.asarray(rows, dtype=numpy.float64)
+    else:
+        a = numpy.zeros((len(rows), dim))
+        for i, r in enumerate(rows):
+            a[i, :len(r)] = r
+    return _norms(a)
+
+
+def _norms(a):
+    numpy = load_numpy()
+    if a.shape[1] == 2:
+        return numpy.hypot(a[:, 0], a[:, 1])   # sans débordement en 2D
+    return numpy.linalg.norm(a, axis=1)
+
+
+def batch(text):
+    """ Normes d'une liste collée, servies par le cache si déjà vue. """
+    key = hashlib.sha1(text.encode("utf-8")).digest()
+    res = _text_cache.get(key)
+    if res is None:
+        lines = [l for l in text.translate(_SEPS).splitlines()
+                 if l.strip() and not l.lstrip().startswith("#")]
+        res = _chunk_norms(lines, None, text) if lines else []
+        _text_cache.put(key, res)
+    return res
+
+
+def _agg(values):
+    """ (min, max, somme) d'un bloc de normes. """
+    if hasattr(values, "min"):
+        return float(values.min()), float(values.max()), float(values.sum())
+    return min(values), max(values), math.fsum(values)
+
+
+def _stats(acc, values):
+    """ acc = [lignes, min, max, somme] mis à jour avec un bloc. """
+    if len(values):
+        lo, hi, tot = _agg(values)
+        acc[0] += len(values)
+        acc[1] = min(acc[1], lo)
+        acc[2] = max(acc[2], hi)
+        acc[3] += tot
+
+
+def _chunk_norms(lines, delim, text=None):
+    """ Normes d'un bloc de lignes : loadtxt d'un coup si elles ont toutes
+    la même dimension, sinon parse_vectors() et complétion par des zéros.
+    `text` : liste collée d'origine, relue pour des numéros de ligne exacts. """
+    numpy = load_numpy()
+    if numpy is not None:
+        try:
+            a = numpy.loadtxt(lines, delimiter=delim, ndmin=2, comments=None)
+            return _norms(a)
+        except ValueError:
+            pass   # lignes de longueurs différentes : chemin général
+    return norms(parse_vectors("\n".join(lines) if text is None else text))
+
+
+def default_out(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}_norms{ext or '.csv'}"
+
+
+def _check_out(path, out, overwrite):
+    if os.path.abspath(out) == os.path.abspath(path):
+        raise ValueError("la sortie ne peut pas remplacer le fichier lu")
+    if not overwrite and os.path.exists(out):
+        raise FileExistsError(f"{out} existe déjà (nommer la sortie pour la remplacer)")
+
+
+def _width(path, delim):
+    """ Nombre de colonnes de la ligne la plus large (lecture à part). """
+    with open(path, newline="", encoding="utf-8") as f:
+        return max((l.count(delim) for l in f if l.strip()), default=0) + 1
+
+
+def stream_csv(path, out=None, chunk=CHUNK_ROWS, progress=None, overwrite=False):
+    """
+    Recopie `path` dans `out` avec une colonne de normes, bloc par bloc.
+    En-tête (première ligne non numérique) conservé ; lignes plus courtes
+    complétées par des champs vides pour que `norm` reste la dernière
+    colonne de toutes. Renvoie
+    {"rows", "min", "max", "mean", "out"} ; progress(lignes) après
+    chaque bloc. FileExistsError si `out` existe, sauf `overwrite`.
+    """
+    out = out or default_out(path)
+    _check_out(path, out, overwrite)
+    acc = [0, math.inf, -math.inf, 0.0]
+    with open(path, newline="", encoding="utf-8") as src, \
+            open(out, "w", newline="", encoding="utf-8") as dst:
+        first = src.readline()
+        try:
+            delim = csv.Sniffer().sniff(first, delimiters=",;\t").delimiter
+        except csv.Error:
+            delim = ","
+        width = _width(path, delim)
+        pad   = lambda l: delim * (width - 1 - l.count(delim))
+        head  = [first]
+        try:
+            [float(x) for x in first.split(delim) if x.strip()]
+        except ValueError:
+            first = first.rstrip("\r\n")
+            dst.write(f"{first}{pad(first)}{delim}{NORM_COL}\n")
+            head = []
+        lines = itertools.chain(head, src)
+        while True:
+            raw = list(itertools.islice(lines, chunk))
+            if not raw:
+                break
+            block = [l.rstrip("\r\n") for l in raw if l.strip()]
+            if not block:
+                continue
+            values = _chunk_norms(block, delim)
+            dst.writelines(f"{l}{pad(l)}{delim}{float(v)!r}\n"
+                           for l, v in zip(block, values))
+            _stats(acc, values)
+            if progress:
+                progress(acc[0])
+    n = acc[0]
+    return {"rows": n, "min": acc[1] if n else 0.0, "max": acc[2] if n else 0.0,
+            "mean": acc[3] / n if n else 0.0, "out": out}
+
+
+def csv_norms(path, out=None, progress=None, overwrite=False):
+    """
+    stream_csv() servi par le cache si le fichier n'a pas changé et que
+    la sortie écrite pour lui est toujours là.
+    """
+    out = out or default_out(path)
+    st  = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, os.path.abspath(out))
+    res = _csv_cache.get(key)
+    try:
+        fresh = res is not None and os.stat(out).st_mtime_ns == res["mtime_ns"]
+    except OSError:
+        fresh = False
+    if not fresh:
+        res = stream_csv(path, out, progress=progress, overwrite=overwrite)
+        res["mtime_ns"] = os.stat(out).st_mtime_ns
+        _csv_cache.put(key, res)
+    return res
+
+
+def format_batch(values, limit=12):
+    """ Aperçu texte d'un lot : premières normes puis min/max/moyenne. """
+    n = len(values)
+    if not n:
+        return "aucun vecteur"
+    lines = [f"{i+1:>4}  {float(v):.4g}" for i, v in enumerate(values[:limit])]
+    if n > limit:
+        lines.append(f"   … {n - limit:,} de plus")
+    lo, hi, tot = _agg(values)
+    lines.append(f"{n:,} normes · min {lo:.4g} · max {hi:.4g} · "
+                 f"moy. {tot / n:.4g}")
+    return "\n".join(lines)
+
+
+def format_csv(res):
+    return (f"{res['rows']:,} lignes → {os.path.basename(res['out'])}\n"
+            f"min {res['min']:.4g} · max {res['max']:.4g} · moy. {res['mean']:.4g}")
+
+
+def benchmark(rows=1_000_000, dim=3):
+    """ Liste collée (Python vs NumPy, cache) puis CSV en flux. """
+    import random
+    rng = random.Random(0)
+    load_numpy()
+    vecs = [[rng.uniform(-100, 100) for _ in range(dim)] for _ in range(100_000)]
+    text = "\n".join(" ".join(f"{x:.3f}" for x in v) for v in vecs)
+    t0 = time.perf_counter(); [math.hypot(*v) for v in parse_vectors(text)]
+    t_py = time.perf_counter() - t0
+    t0 = time.perf_counter(); batch(text)
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter(); batch(text)
+    t_hot = time.perf_counter() - t0
+    print(f"{len(vecs):,} vecteurs {dim}D collés : boucle math.hypot "
+          f"{t_py*1000:.0f} ms, batch() {t_cold*1000:.0f} ms, "
+          f"depuis le cache {t_hot*1e6:.0f} µs")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vecteurs.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(f"x{i}" for i in range(dim)) + "\n")
+            for k in range(0, rows, len(vecs)):
+                f.writelines(",".join(f"{x:.3f}" for x in v) + "\n"
+                             for v in vecs[:rows - k])
+        size = os.path.getsize(path)
+        t0 = time.perf_counter()
+        res = csv_norms(path)
+        dt = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        csv_norms(path)   # même fichier, sortie intacte : servi par le cache
+        t_hit = time.perf_counter() - t0
+    try:
+        import resource
+        peak = f", pic mémoire {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo"
+    except ImportError:
+        peak = ""
+    print(f"CSV {size / 2**20:.0f} Mo : {res['rows']:,} lignes en {dt:.2f}s "
+          f"({res['rows']/dt:,.0f} lignes/s, blocs de {CHUNK_ROWS:,}{peak}) ; "
+          f"relu depuis le cache {t_hit*1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(*(int(a) for a in sys.argv[2:4]))
+    elif len(sys.argv) > 1:
+        try:
+            print(format_csv(csv_norms(sys.argv[1], *sys.argv[2:3],
+                                       overwrite=len(sys.argv) > 2)))
+        except (FileExistsError, ValueError) as e:
+            sys.exit(f"pythagore : {e}")
+    else:
+        try:
+            print(format_batch(batch(sys.stdin.read())))
+        except ValueError as e:
+            sys.exit(f"pythagore : {e}")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Enregistrement et rejeu déterministe des sessions :
+- Recorder : écrit en lots les actions de GameState.log (une ligne JSON
+  [t_ms, op, args…] par action) précédées d'un en-tête (graine,
+  catalogue, état initial) et ponctuées de points de contrôle de l'état,
+- replay() : rejoue un fichier sans affichage à vitesse maximale,
+  vérifie chaque point de contrôle et mesure le débit (événements/s) ;
+  refuse une session dont les courses ont été tirées par un autre
+  algorithme (engine.RACE_PLAN, noté dans l'en-tête),
+- seules les SESSION_KEEP dernières sessions du dossier sont gardées.
+`python replay.py <session.jsonl>` rejoue une session enregistrée,
+`python replay.py --bench [n]` génère puis rejoue une journée synthétique.
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+from engine import GameState, RACE_PLAN
+from persistence import STATE_DIR
+
+SESSION_DIR  = os.path.join(STATE_DIR, "sessions")
+SESSION_KEEP = 30   # sessions conservées (nom horodaté = ordre chronologique)
+
+
+class ReplayMismatch(Exception):
+    pass
+
+
+def prune_sessions(root=SESSION_DIR, keep=SESSION_KEEP):
+    """ Supprime les sessions les plus anciennes au-delà de `keep`. """
+    try:
+        names = sorted(n for n in os.listdir(root) if n.endswith(".jsonl"))
+    except OSError:
+        return
+    for name in names[:max(0, len(names) - keep)]:
+        try:
+            os.remove(os.path.join(root, name))
+        except OSError:
+            pass
+
+
+class Recorder:
+    """ Branche game.log et l'écrit dans `path` à chaque flush(). """
+
+    def __init__(self, game, path=None):
+        if path is None:
+            prune_sessions(keep=SESSION_KEEP - 1)   # place pour celle-ci
+            path = os.path.join(SESSION_DIR,
+                                time.strftime("%Y%m%d-%H%M%S") + ".jsonl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.game = game
+        self.path = path
+        eco = game.economy
+        eco.settle()
+        header = {
+            "seed":    game.seed,
+            "race_plan": RACE_PLAN,
+            "t":       eco._since,
+            "frac":    eco._frac,
+            "finish":  game.race.finish,
+            "odds":    game.race.odds,
+            "catalog": [{"emoji": u.emoji, "cost": u.cost,
+                         "interval": u.interval, "amount": u.amount}
+                        for u in eco.upgrades],
+            "state":   game.summary(),
+        }
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        game.log = []
+
+    def flush(self, check=True):
+        """ Écrit les actions en attente, puis un point de contrôle. """
+        log = self.game.log
+        if not log:
+            return
+        self.game.log = []
+        lines = [json.dumps(ev) for ev in log]
+        if check:
+            eco = self.game.economy
+            eco.settle()
+            lines.append(json.dumps({"t": eco._since,
+                                     "check": self.game.summary()}))
+        self._f.write("\n".join(lines) + "\n")
+        self._f.flush()
+
+    def close(self):
+        self.flush()
+        self._f.close()
+
+
+def replay(path):
+    """
+    Rejoue la session `path` ; lève ReplayMismatch au premier point de
+    contrôle divergent. Renvoie (GameState final, nb d'événements, durée s).
+    """
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        plan = header.get("race_plan", "inconnu")
+        if plan != RACE_PLAN:
+            raise ReplayMismatch(f"courses tirées par « {plan} », ce moteur "
+                                 f"utilise « {RACE_PLAN} »")
+        now = [header["t"] / 1000]
+        g = GameState(header["seed"], upgrades=header["catalog"],
+                      horse_finish=header["finish"], clock=lambda: now[0])
+        eco = g.economy
+        for up, n in zip(eco.upgrades, header["state"]["counts"]):
+            up.count = n
+        eco.recompute_rate()
+        eco.cookies = header["state"]["cookies"]
+        eco._since, eco._frac = header["t"], header["frac"]
+        g.race.set_odds(header["odds"])
+
+        n = 0
+        t0 = time.perf_counter()
+        for line in f:
+            ev = json.loads(line)
+            if isinstance(ev, dict):
+                now[0] = ev["t"] / 1000
+                eco.settle()
+                if g.summary() != ev["check"]:
+                    raise ReplayMismatch(
+                        f"t={ev['t']} : {g.summary()} != {ev['check']}")
+                continue
+            now[0] = ev[0] / 1000
+            g.do(ev[1], *ev[2:])
+            n += 1
+        return g, n, time.perf_counter() - t0
+
+
+def synthetic_day(path, seed=0, hours=8):
+    """ Session d'une journée jouée par un bot (clics, achats, paris). """
+    rng = random.Random(seed)
+    now = [0.0]
+    g = GameState(seed, clock=lambda: now[0])
+    rec = Recorder(g, path)
+    eco, bj, race = g.economy, g.blackjack, g.race
+    end = hours * 3600
+    while now[0] < end:
+        now[0] += rng.uniform(0.05, 2.0)
+        r = rng.random()
+        if r < 0.90:
+            g.do("click")
+        elif r < 0.93:
+            g.do("buy", rng.randrange(len(eco.upgrades)))
+        elif r < 0.98 and eco.cookies > 10:
+            g.do("bet", rng.randint(1, 10))
+            while bj.in_round and bj.player.total < 17:
+                g.do("hit")
+            if bj.in_round:
+                g.do("stand")
+        elif eco.cookies > 10:
+            g.do("race", rng.randint(1, race.count), rng.randint(1, 10))
+            while race.running:
+                g.do("step")
+        if len(g.log) > 1000:
+            rec.flush()
+    rec.close()
+    return g
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] != "--bench":
+        g, n, dt = replay(sys.argv[1])
+    else:
+        hours = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+        path = os.path.join(tempfile.mkdtemp(), "bench.jsonl")
+        synthetic_day(path, hours=hours)
+        g, n, dt = replay(path)
+    print(f"OK {g.summary()}")
+    print(f"{n:,} événements en {dt:.2f}s ({n/dt:,.0f} événements/s)")
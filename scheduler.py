@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ordonnanceur central pour les tâches périodiques de l'overlay :
+- un seul root.after armé à la fois (sur la prochaine échéance),
+- échéances voisines regroupées dans le même réveil (COALESCE_MS),
+- cadence sans dérive calée sur time.monotonic,
+- rattrapage optionnel des périodes manquées si Tk a pris du retard,
+- pause / reprise des tâches par groupe,
+- profilage optionnel (profiler.Profiler) : retard de chaque réveil et
+  durée de chaque tâche, par nom.
+"""
+import time
+import heapq
+import traceback
+
+COALESCE_MS = 8   # tâches dues dans cette fenêtre : lancées ensemble
+
+
+class Job:
+    __slots__ = ("fn", "name", "interval", "group", "catch_up", "deadline",
+                 "remaining", "cancelled", "paused", "seq")
+
+    def __init__(self, fn, interval, group, catch_up, deadline, name=None):
+        self.fn        = fn
+        self.name      = name or getattr(fn, "__qualname__", repr(fn))
+        self.interval  = interval   # secondes, None pour un job unique
+        self.group     = group
+        self.catch_up  = catch_up
+        self.deadline  = deadline
+        self.remaining = 0.0
+        self.cancelled = False
+        self.paused    = False
+        self.seq       = 0          # entrée de tas valide pour ce job
+
+
+class Scheduler:
+    """
+    every(ms, fn) / once(ms, fn) renvoient un Job annulable via cancel().
+    Avec catch_up=True, fn reçoit le nombre de périodes écoulées
+    depuis son dernier appel (>= 1) au lieu d'en perdre.
+    """
+
+    def __init__(self, root, clock=time.monotonic, coalesce_ms=COALESCE_MS,
+                 profiler=None):
+        self.root     = root
+        self.profiler = profiler
+        self.clock    = clock
+        self.coalesce = coalesce_ms / 1000.0
+        self._heap    = []
+        self._seq     = 0
+        self._paused  = set()
+        self._parked  = []     # jobs des groupes en pause
+        self._after   = None
+        self._armed   = None   # échéance du root.after en cours
+        self.lag      = 0.0    # retard du dernier réveil (s)
+
+    # -- enregistrement --
+    def every(self, interval_ms, fn, group=None, catch_up=False, delay_ms=None,
+              name=None):
+        interval = interval_ms / 1000.0
+        first = interval if delay_ms is None else delay_ms / 1000.0
+        job = Job(fn, interval, group, catch_up, self.clock() + first, name)
+        self._push(job)
+        return job
+
+    def once(self, delay_ms, fn, group=None, name=None):
+        job = Job(fn, None, group, False, self.clock() + delay_ms / 1000.0,
+                  name)
+        self._push(job)
+        return job
+
+    def cancel(self, job):
+        if job is not None:
+            job.cancelled = True
+
+    # -- groupes --
+    def pause(self, group):
+        if group in self._paused:
+            return
+        self._paused.add(group)
+        for _, _, job in self._heap:
+            if job.group == group and not job.paused and not job.cancelled:
+                self._park(job)
+
+    def resume(self, group):
+        if group not in self._paused:
+            return
+        self._paused.discard(group)
+        now = self.clock()
+        parked, self._parked = self._parked, []
+        for job in parked:
+            if job.group != group:
+                self._parked.append(job)
+            elif not job.cancelled:
+                job.paused   = False
+                job.deadline = now + job.remaining
+                self._push(job)
+
+    def is_paused(self, group):
+        return group in self._paused
+
+    # -- boucle --
+    def _park(self, job):
+        job.paused    = True
+        job.remaining = max(0.0, job.deadline - self.clock())
+        self._parked.append(job)
+
+    def _push(self, job, arm=True):
+        if job.group in self._paused:
+            self._park(job)
+            return
+        self._seq += 1
+        job.seq = self._seq
+        heapq.heappush(self._heap, (job.deadline, self._seq, job))
+        if arm:
+            self._arm()
+
+    def _arm(self):
+        # entrées périmées (annulées / en pause / replanifiées) en tête : purge
+        heap = self._heap
+        while heap and self._stale(heap[0]):
+            heapq.heappop(heap)
+        if not heap:
+            return
+        deadline = heap[0][0]
+        if self._after is not None:
+            if self._armed <= deadline:
+                return
+            self.root.after_cancel(self._after)
+        delay = max(0, int((deadline - self.clock()) * 1000))
+        self._armed = deadline
+        self._after = self.root.after(delay, self._run)
+
+    def _run(self):
+        self._after = None
+        now = self.clock()
+        heap = self._heap
+        self.lag = now - self._armed
+        if self.profiler:
+            self.profiler.lag(self.lag)
+        try:
+            while heap and heap[0][0] <= now + self.coalesce:
+                entry = heapq.heappop(heap)
+                if self._stale(entry):
+                    continue
+                deadline, _, job = entry
+                if job.interval is None:
+                    self._call(job)
+                    continue
+                # périodes écoulées depuis l'échéance, sans dérive
+                n = 1 + max(0, int((now - deadline + 1e-9) // job.interval))
+                job.deadline = deadline + n * job.interval
+                if job.catch_up:
+                    self._call(job, n)
+                else:
+                    self._call(job)
+                if not job.cancelled:
+                    self._push(job, arm=False)
+        finally:
+            self._arm()
+
+    @staticmethod
+    def _stale(entry):
+        _, seq, job = entry
+        return job.cancelled or job.paused or seq != job.seq
+
+    def _call(self, job, *args):
+        try:
+            if self.profiler:
+                self.profiler.timed(job.name, job.fn, *args)
+            else:
+                job.fn(*args)
+        except Exception:
+            traceback.print_exc()
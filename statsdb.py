@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Historique des parties dans SQLite (stats.db, mode WAL) :
+- chaque main de Blackjack, course et achat de la boutique devient une
+  ligne `events` (horodatage, jeu, résultat, mise, gain net),
+- agrégats par jour et par jeu (`daily`) tenus à jour dans la même
+  transaction : les statistiques ne lisent que quelques lignes par jour,
+  même après des années d'historique,
+- salaire gagné par jour (`salary`),
+- écritures regroupées par un thread dédié (au plus BATCH_MS d'attente,
+  une transaction par lot) : record() ne fait qu'un put() dans une
+  queue, le thread Tk n'attend jamais le disque,
+- requêtes exécutées par le même thread, résultats rendus au thread Tk
+  par poll() (même principe que media.StreamResolver).
+`python statsdb.py --bench [années]` remplit un historique synthétique
+et mesure les requêtes.
+"""
+import os
+import sys
+import time
+import queue
+import random
+import sqlite3
+import tempfile
+import threading
+import traceback
+
+from persistence import STATE_DIR
+from engine import BJ_WIN, BJ_PUSH
+
+STATS_FILE = os.path.join(STATE_DIR, "stats.db")
+BATCH_MS   = 500    # attente maximale d'un lot avant écriture
+BATCH_MAX  = 1000   # lignes par transaction au plus
+STATS_WINDOWS = [("24 h", 24*3600), ("7 jours", 7*24*3600), ("tout", None)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id     INTEGER PRIMARY KEY,
+    t      REAL    NOT NULL,
+    game   TEXT    NOT NULL,
+    result TEXT,
+    stake  INTEGER NOT NULL DEFAULT 0,
+    net    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_t      ON events(t);
+CREATE INDEX IF NOT EXISTS events_game_t ON events(game, t);
+CREATE TABLE IF NOT EXISTS daily (
+    day    TEXT    NOT NULL,
+    game   TEXT    NOT NULL,
+    n      INTEGER NOT NULL,
+    wins   INTEGER NOT NULL,
+    net    INTEGER NOT NULL,
+    PRIMARY KEY (day, game)
+);
+CREATE TABLE IF NOT EXISTS salary (
+    day    TEXT PRIMARY KEY,
+    earned REAL NOT NULL
+);
+"""
+
+_INSERT = "INSERT INTO events (t, game, result, stake, net) VALUES (?,?,?,?,?)"
+_ROLLUP = """
+INSERT INTO daily (day, game, n, wins, net) VALUES (?,?,1,?,?)
+ON CONFLICT (day, game) DO UPDATE SET
+    n = n + 1, wins = wins + excluded.wins, net = net + excluded.net
+"""
+_SALARY = """
+INSERT INTO salary (day, earned) VALUES (?,?)
+ON CONFLICT (day) DO UPDATE SET earned = max(earned, excluded.earned)
+"""
+
+
+def _day(t):
+    return time.strftime("%Y-%m-%d", time.localtime(t))
+
+
+class StatsDB:
+    """
+    record() / record_salary() depuis n'importe quel thread ; query(fn,
+    callback) exécute fn(connexion) sur le thread d'écriture et
+    callback(résultat) au prochain poll() du thread Tk.
+    """
+
+    def __init__(self, path=STATS_FILE, clock=time.time):
+        self.path    = path
+        self.clock   = clock
+        self._q      = queue.Queue()
+        self._done   = queue.SimpleQueue()
+        self._stake  = 0
+        self.session = {}   # jeu → [parties, victoires, net] depuis le lancement
+        self._game   = None
+        self._thread = threading.Thread(target=self._worker, daemon=True,
+                                        name="statsdb")
+        self._thread.start()
+
+    # -- branchement sur engine.GameState --
+    def attach(self, game):
+        self._game = game
+        game.economy.subscribe(self._on_economy)
+        game.blackjack.subscribe(self._on_blackjack)
+        game.race.subscribe(self._on_race)
+
+    def _on_economy(self, event, *args):
+        if event == "upgrade":
+            up = self._game.economy.upgrades[args[0]]
+            self.record("shop", up.emoji, up.cost, -up.cost)
+
+    def _on_blackjack(self, event, *args):
+        if event == "bet":
+            self._stake = args[0]   # remise à 0 par le moteur avant "result"
+        elif event == "result":
+            res, stake = args[0], self._stake
+            net = stake if res == BJ_WIN else 0 if res == BJ_PUSH else -stake
+            self.record("blackjack", res, stake, net)
+
+    def _on_race(self, event, *args):
+        if event == "finish":
+            num, gain = args
+            stake = self._game.race.stake
+            self.record("horses", str(num), stake, gain - stake)
+
+    # -- écriture (non bloquante) --
+    def record(self, game, result, stake, net, t=None):
+        tot = self.session.setdefault(game, [0, 0, 0])
+        tot[0] += 1; tot[1] += net > 0; tot[2] += net
+        self._q.put(("event", (self.clock() if t is None else t,
+                               game, result, stake, net)))
+
+    def record_salary(self, earned, t=None):
+        self._q.put(("salary", (_day(self.clock() if t is None else t), earned)))
+
+    def record_day(self, pay, start, now):
+        """
+        Salaire du jour en cours pour un payroll.PaySchedule : gagné
+        depuis minuit, ou depuis `start` si la journée a commencé après.
+        """
+        midnight = time.mktime(time.localtime(now)[:3] + (0, 0, 0, 0, 0, -1))
+        self.record_salary(pay.earned(max(start, midnight), now), t=now)
+
+    def query(self, fn, callback):
+        self._q.put(("query", (fn, callback)))
+
+    def poll(self):
+        """ Thread Tk : callbacks des requêtes terminées. """
+        while True:
+            try:
+                callback, res = self._done.get_nowait()
+            except queue.Empty:
+                return
+            callback(res)
+
+    def close(self):
+        self._q.put(("stop", None))
+        self._thread.join(timeout=5)
+
+    # -- thread d'écriture --
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")   # WAL : sûr en cas de plantage
+        db.executescript(SCHEMA)
+        return db
+
+    def _worker(self):
+        db = self._connect()
+        running = True
+        while running:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + BATCH_MS / 1000.0
+            # un lot se ferme au délai, à BATCH_MAX, ou sur une requête
+            while batch[-1][0] in ("event", "salary") and len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._q.get(
+                        timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(db, [b for b in batch if b[0] in ("event", "salary")])
+            except sqlite3.Error:
+                traceback.print_exc()
+            for kind, payload in batch:
+                if kind == "query":
+                    fn, callback = payload
+                    try:
+                        self._done.put((callback, fn(db)))
+                    except sqlite3.Error:
+                        traceback.print_exc()
+                elif kind == "stop":
+                    running = False
+        db.close()
+
+    @staticmethod
+    def _write(db, items):
+        if not items:
+            return
+        events = [p for k, p in items if k == "event"]
+        with db:   # une transaction par lot
+            db.executemany(_INSERT, events)
+            db.executemany(_ROLLUP, [(_day(t), game, int(net > 0), net)
+                                     for t, game, _, _, net in events])
+            db.executemany(_SALARY, [p for k, p in items if k == "salary"])
+
+
+# -- requêtes (exécutées sur le thread d'écriture) --
+def summary(db, now=None, windows=STATS_WINDOWS):
+    """
+    {fenêtre: {jeu: (parties, victoires, net)}, "per_hour": net/h,
+    "salary": [(jour, gagné)]}. Jours complets lus dans `daily`, seul
+    le jour en cours de fenêtre glissante passe par `events`.
+    """
+    now = time.time() if now is None else now
+    out = {}
+    for name, span in windows:
+        stats = {}
+        if span is None:
+            rows = db.execute("SELECT game, SUM(n), SUM(wins), SUM(net) "
+                              "FROM daily GROUP BY game")
+        else:
+            since = now - span
+            # jours entiers dans la fenêtre + bord glissant via l'index (game, t)
+            first_full = _day(since + 24*3600)
+            edge_end = time.mktime(time.strptime(first_full, "%Y-%m-%d"))
+            rows = db.execute(
+                "SELECT game, SUM(n), SUM(wins), SUM(net) FROM ("
+                " SELECT game, n, wins, net FROM daily WHERE day >= ?"
+                " UNION ALL"
+                " SELECT game, 1, net > 0, net FROM events"
+                "  WHERE t >= ? AND t < ?"
+                ") GROUP BY game", (first_full, since, edge_end))
+        for game, n, wins, net in rows:
+            stats[game] = (n, wins, net)
+        out[name] = stats
+    first = db.execute("SELECT MIN(t) FROM events").fetchone()[0]
+    hours = max((now - first) / 3600, 1.0) if first else 1.0
+    net_all = sum(v[2] for v in out.get("tout", {}).values())
+    out["per_hour"] = net_all / hours
+    out["salary"] = db.execute(
+        "SELECT day, earned FROM salary ORDER BY day DESC LIMIT 14").fetchall()
+    return out
+
+
+def format_summary(s):
+    """ Texte de la fenêtre de statistiques. """
+    lines = []
+    for name, _ in STATS_WINDOWS:
+        lines.append(f"— {name} —")
+        for game, (n, wins, net) in sorted(s[name].items()):
+            rate = f"{wins/n:.0%} gagnées" if game != "shop" and n else "achats"
+            lines.append(f"  {game:<10} {n:>7,} × {rate:<13} net {net:+,} 🍪")
+    lines.append(f"net moyen : {s['per_hour']:+,.1f} 🍪/h")
+    lines.append("— salaire par jour —")
+    lines += [f"  {day}  {earned:,.2f}" for day, earned in s["salary"]]
+    return "\n".join(lines)
+
+
+def benchmark(years=3, per_day=2000):
+    path = os.path.join(tempfile.mkdtemp(), "stats.db")
+    stats = StatsDB(path)
+    rng = random.Random(0)
+    now = time.time()
+    t0 = time.perf_counter()
+    n = 0
+    for d in range(years * 365, 0, -1):
+        day0 = now - d * 24 * 3600
+        for k in range(per_day):
+            game = rng.choice(("blackjack", "horses"))
+            stake = rng.randint(1, 50)
+            stats.record(game, "", stake, rng.choice((stake, -stake)),
+                         t=day0 + k * 24 * 3600 / per_day)
+        stats.record_salary(3000 * 8, t=day0)
+        n += per_day
+    t_put = time.perf_counter() - t0
+    result = []
+    stats.query(lambda db: None, result.append)   # attend la fin des écritures
+    while not result:
+        stats.poll()
+        time.sleep(0.01)
+    t_write = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    stats.query(summary, result.append)
+    while len(result) < 2:
+        stats.poll()
+        time.sleep(0.001)
+    t_query = time.perf_counter() - t0
+    stats.close()
+    print(format_summary(result[1]))
+    print(f"{n:,} événements : record() {t_put/n*1e6:.2f} µs, "
+          f"écrits en {t_write:.1f}s ({n/t_write:,.0f}/s), "
+          f"statistiques en {t_query*1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tableau d'équipe (NumPy) : les gains de milliers de compteurs à la fois.
+- CSV d'employés : name, rate (€/h), start (ISO « 2026-10-17 08:00 »
+  ou « HH:MM » aujourd'hui), schedule :
+    vide            poste continu,
+    08:00-17:00     tous les jours,
+    08:00-17:00/01234   jours listés (0 = lundi),
+    equipe.json     règles complètes au format de payroll.py,
+- chaque horaire distinct est compilé une fois en table payroll
+  (heures payées équivalentes, majorations comprises),
+- par tick : une recherche bisect par horaire puis une seule
+  expression NumPy pour tous les employés,
+- top N (argpartition) et total agrégé pour l'affichage.
+`python team.py [employés]` mesure le coût d'un tick.
+"""
+import os
+import sys
+import csv
+import time
+from datetime import datetime, date
+import numpy as np
+
+from payroll import PaySchedule, load_shifts
+
+TEAM_TOP = 10
+
+
+def parse_schedule(spec, base_dir="."):
+    """ Règles payroll (taux 1 €/h) pour une cellule `schedule`. """
+    spec = spec.strip()
+    if spec.endswith(".json"):
+        rules = dict(load_shifts(1.0, os.path.join(base_dir, spec)))
+    elif spec:
+        hours, _, days = spec.partition("/")
+        start, end = hours.split("-")
+        shift = {"start": start, "end": end}
+        if days:
+            shift["days"] = [int(d) for d in days]
+        rules = {"shifts": [shift]}
+    else:
+        rules = {"shifts": [{"start": "00:00", "end": "24:00"}]}
+    rules["rate"] = 1.0   # gains = taux de l'employé × heures équivalentes
+    return rules
+
+
+def parse_start(text, today=None):
+    text = text.strip()
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        d = today or date.today()
+        h, m = text.split(":")
+        return datetime(d.year, d.month, d.day, int(h), int(m)).timestamp()
+
+
+class Team:
+    """
+    Un élément par employé dans rates, sched (indice d'horaire) et
+    hstart (heures équivalentes avant l'arrivée) ; tick(now) → gains.
+    """
+
+    def __init__(self, names, rates, starts, schedules, base_dir="."):
+        keys   = sorted(set(schedules))
+        lookup = {k: i for i, k in enumerate(keys)}
+        self.names  = list(names)
+        self.pays   = [PaySchedule(parse_schedule(k, base_dir)) for k in keys]
+        self.rates  = np.asarray(rates, dtype=np.float64)
+        self.sched  = np.fromiter((lookup[k] for k in schedules),
+                                  dtype=np.intp, count=len(self.names))
+        starts      = np.asarray(starts, dtype=np.float64)
+        self.origin = []
+        self.hstart = np.empty(len(self.names))
+        for i, pay in enumerate(self.pays):
+            mask   = self.sched == i
+            origin = float(starts[mask].min())
+            pay.earned(origin, float(starts[mask].max()))   # compile la table
+            self.hstart[mask] = _hours(pay, starts[mask]) - _hours(pay, origin)
+            self.origin.append(origin)
+        self.hnow   = np.zeros(len(self.pays))
+        self.earned = np.zeros(len(self.names))
+
+    @classmethod
+    def from_csv(cls, path):
+        names, rates, starts, specs = [], [], [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names.append(row["name"])
+                rates.append(float(row["rate"]))
+                starts.append(parse_start(row["start"]))
+                specs.append((row.get("schedule") or "").strip())
+        return cls(names, rates, starts, specs,
+                   base_dir=os.path.dirname(os.path.abspath(path)))
+
+    def tick(self, now):
+        for i, pay in enumerate(self.pays):
+            self.hnow[i] = pay.earned(self.origin[i], now)
+        np.maximum(self.rates * (self.hnow[self.sched] - self.hstart), 0.0,
+                   out=self.earned)
+        return self.earned
+
+    def total(self):
+        return float(self.earned.sum())
+
+    def top(self, n=TEAM_TOP):
+        """ [(nom, gains)] des n meilleurs, du premier au n-ième. """
+        n = min(n, len(self.names))
+        if not n:
+            return []
+        idx = np.argpartition(self.earned, -n)[-n:]
+        idx = idx[np.argsort(self.earned[idx])[::-1]]
+        return [(self.names[i], float(self.earned[i])) for i in idx]
+
+
+def _hours(pay, t):
+    """ Gagné (taux 1) depuis le début de la table, pour un tableau d'instants. """
+    times = np.asarray(pay.times)
+    i = np.searchsorted(times, t, side="right") - 1
+    j = np.maximum(i, 0)
+    h = np.asarray(pay.cum)[j] + np.asarray(pay.rates)[j] * (t - times[j])
+    return np.where(i < 0, 0.0, h)
+
+
+def synthetic_team(n, seed=0):
+    """ n employés aux taux, arrivées et horaires variés. """
+    rng   = np.random.default_rng(seed)
+    today = datetime.combine(date.today(), datetime.min.time()).timestamp()
+    specs = ["", "08:00-17:00/01234", "06:00-14:00", "22:00-06:00/0123456"]
+    return Team([f"emp{i:05d}" for i in range(n)],
+                rng.uniform(1500, 6000, n).round(2),
+                today + rng.uniform(0, 12*3600, n),
+                [specs[k] for k in rng.integers(0, len(specs), n)])
+
+
+def benchmark(n=10_000, ticks=200):
+    t0 = time.perf_counter()
+    team = synthetic_team(n)
+    dt_load = time.perf_counter() - t0
+    now = time.time()
+    t0 = time.perf_counter()
+    for k in range(ticks):
+        team.tick(now + k * 0.1)
+        team.top()
+        team.total()
+    dt = (time.perf_counter() - t0) / ticks
+    print(f"{n:,} employés : chargement {dt_load*1000:.0f} ms, "
+          f"tick + top {TEAM_TOP} + total {dt*1000:.3f} ms (frame : 16 ms)")
+
+
+if __name__ == "__main__":
+    for n in ([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]):
+        benchmark(n)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+""" Cache des médias (LRU, keep=), expiration des URL signées, fetch concurrents. """
+import os
+import time
+import threading
+
+from media import (MediaCache, StreamCache, LocalSource, url_expiry,
+                   STREAM_TTL_DEFAULT, STREAM_TTL_MARGIN)
+
+
+def _writer(size, calls=None):
+    """ Téléchargeur factice : `size` octets dans dest.mp4. """
+    def download(url, fmt, dest, cancel=None):
+        if calls is not None:
+            calls.append(url)
+        path = dest + ".mp4"
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        return path
+    return download
+
+
+def _age(cache, url, t):
+    path = cache.get(url, "f")
+    os.utime(path, (t, t))
+    return path
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = MediaCache(root=str(tmp_path), max_bytes=250, downloader=_writer(100))
+    now = time.time()
+    a = cache.fetch("a", "f"); _age(cache, "a", now - 30)
+    b = cache.fetch("b", "f"); _age(cache, "b", now - 20)
+    _age(cache, "a", now - 10)   # relu : plus récent que b
+    c = cache.fetch("c", "f")
+    assert os.path.exists(a) and os.path.exists(c)
+    assert not os.path.exists(b)
+    assert cache.get("b", "f") is None
+
+
+def test_evict_spares_keep(tmp_path):
+    # fichier neuf plus gros que le budget : tout le reste part, lui reste
+    cache = MediaCache(root=str(tmp_path), max_bytes=150, downloader=_writer(100))
+    old = cache.fetch("old", "f")
+    cache.downloader = _writer(200)
+    big = cache.fetch("big", "f")
+    os.utime(big, (time.time() - 60,) * 2)   # même le plus ancien
+    cache._evict(keep=big)
+    assert os.path.exists(big)
+    assert not os.path.exists(old)
+
+
+def test_evict_ignores_partial_downloads(tmp_path):
+    cache = MediaCache(root=str(tmp_path), max_bytes=50, downloader=_writer(100))
+    part = tmp_path / "0123.mp4.part"
+    part.write_bytes(b"\0" * 500)
+    cache.fetch("a", "f")
+    assert part.exists()
+
+
+def test_url_expiry_query_and_path():
+    assert url_expiry("https://x/videoplayback?expire=2000000000&id=1") \
+        == 2000000000 - STREAM_TTL_MARGIN
+    assert url_expiry("https://x/videoplayback/id/1/expire/2000000000/sig/a") \
+        == 2000000000 - STREAM_TTL_MARGIN
+
+
+def test_url_expiry_default_ttl():
+    assert url_expiry("https://x/file.mp4", now=1000.0) == 1000.0 + STREAM_TTL_DEFAULT
+    assert url_expiry("https://x/v?expire=abc", now=1000.0) == 1000.0 + STREAM_TTL_DEFAULT
+
+
+def test_stream_cache_drops_expired(tmp_path):
+    path = str(tmp_path / "streams.json")
+    cache = StreamCache(path)
+    now = int(time.time())
+    live = f"https://x/v?expire={now + 3600}"
+    dead = f"https://x/v?expire={now + STREAM_TTL_MARGIN - 1}"   # dans la marge
+    cache.put("live", "f", live)
+    cache.put("dead", "f", dead)
+    assert cache.get("live", "f") == live
+    assert cache.get("dead", "f") is None
+    # relu du disque : l'entrée expirée n'y est plus
+    assert StreamCache(path).get("live", "f") == live
+    assert "f|dead" not in StreamCache(path)._data
+
+
+def test_concurrent_fetch_downloads_once(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    write = _writer(10, calls)
+
+    def slow(url, fmt, dest, cancel=None):
+        started.set()
+        release.wait(5)
+        return write(url, fmt, dest)
+
+    cache = MediaCache(root=str(tmp_path), downloader=slow)
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.fetch("a", "f")))
+    first.start()
+    assert started.wait(5)
+    assert cache.fetch("a", "f") is None   # déjà en cours : pas de doublon
+    release.set()
+    first.join(5)
+    assert calls == ["a"]
+    assert results[0] and os.path.exists(results[0])
+    # terminé : un nouveau fetch est de nouveau possible
+    assert cache.fetch("a", "f") is not None
+    assert calls == ["a", "a"]
+
+
+def test_closed_cache_cancels(tmp_path):
+    seen = []
+
+    def download(url, fmt, dest, cancel=None):
+        seen.append(cancel.is_set())
+        return _writer(1)(url, fmt, dest)
+
+    cache = MediaCache(root=str(tmp_path), downloader=download)
+    cache.fetch("a", "f")
+    cache.close()
+    assert cache.fetch("b", "f") is None
+    assert seen == [False]
+
+
+def test_local_source_feeds_media_cache(tmp_path):
+    src_dir = tmp_path / "src"; src_dir.mkdir()
+    (src_dir / "abc123.mp4").write_bytes(b"video")
+    src = LocalSource(str(src_dir))
+    url = "https://www.youtube.com/watch?v=abc123"
+    assert src.extract(url, "f")["url"] == str(src_dir / "abc123.mp4")
+    cache = MediaCache(root=str(tmp_path / "cache"), downloader=src.download)
+    path = cache.fetch(url, "f")
+    assert cache.get(url, "f") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"video"
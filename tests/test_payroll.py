@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+""" Table de paie autour des changements d'heure (Europe/Paris). """
+import time
+from datetime import datetime
+
+import pytest
+
+from payroll import PaySchedule
+
+pytestmark = pytest.mark.skipif(not hasattr(time, "tzset"),
+                                reason="time.tzset indisponible")
+
+RATE = 3000.0
+H    = 3600
+
+
+@pytest.fixture(autouse=True)
+def paris(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Paris")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def at(*args):
+    """ Epoch d'une heure murale locale (la première si elle est ambiguë). """
+    return time.mktime(datetime(*args).timetuple())
+
+
+def continuous():
+    return PaySchedule({"rate": RATE, "shifts": [{"start": "00:00", "end": "24:00"}]})
+
+
+@pytest.mark.parametrize("start, end", [
+    ((2026, 10, 24), (2026, 10, 27)),   # passage à l'heure d'hiver le 25
+    ((2027, 3, 27), (2027, 3, 30)),     # passage à l'heure d'été le 28
+])
+def test_continuous_pays_every_real_second(start, end):
+    pay = continuous()
+    t0, t1 = at(*start), at(*end)
+    assert pay.earned(t0, t1) == pytest.approx(RATE * (t1 - t0) / H, rel=1e-9)
+
+
+@pytest.mark.parametrize("moment", [
+    (2026, 10, 25, 23, 30),   # dernière heure du jour de 25 h
+    (2026, 10, 26, 0, 30),
+    (2027, 3, 28, 23, 30),    # dernière heure du jour de 23 h
+    (2027, 3, 29, 0, 30),
+])
+def test_continuous_rate_around_midnight(moment):
+    pay = continuous()
+    pay.earned(at(2026, 10, 1), at(2027, 4, 1))
+    assert pay.rate_at(at(*moment)) == pytest.approx(RATE)
+
+
+def test_overnight_shift_fall_back():
+    # samedi 22:00 → dimanche 06:00, nuit du 24 au 25 octobre 2026 : 9 h réelles
+    pay = PaySchedule({"rate": RATE,
+                       "shifts": [{"days": [5], "start": "22:00", "end": "06:00"}]})
+    assert pay.earned(at(2026, 10, 24, 12), at(2026, 10, 25, 12)) \
+        == pytest.approx(9 * RATE)
+    assert pay.rate_at(at(2026, 10, 25, 5, 59)) == pytest.approx(RATE)
+    assert pay.rate_at(at(2026, 10, 25, 6, 1)) == 0.0
+
+
+def test_overnight_shift_spring_forward():
+    # nuit du 27 au 28 mars 2027 : 7 h réelles
+    pay = PaySchedule({"rate": RATE,
+                       "shifts": [{"days": [5], "start": "22:00", "end": "06:00"}]})
+    assert pay.earned(at(2027, 3, 27, 12), at(2027, 3, 28, 12)) \
+        == pytest.approx(7 * RATE)
+    assert pay.rate_at(at(2027, 3, 28, 5, 59)) == pytest.approx(RATE)
+    assert pay.rate_at(at(2027, 3, 28, 6, 1)) == 0.0
+
+
+def test_night_and_overtime_on_fall_back_night():
+    # 9 h réelles de nuit (×1.25) dont la dernière en heure sup. (×1.5)
+    pay = PaySchedule({"rate": RATE,
+                       "shifts": [{"days": [5], "start": "22:00", "end": "06:00"}],
+                       "night": {"start": "22:00", "end": "06:00", "mult": 1.25},
+                       "overtime": {"daily_h": 8, "mult": 1.5}})
+    night = RATE * 1.25
+    assert pay.earned(at(2026, 10, 24, 12), at(2026, 10, 25, 12)) \
+        == pytest.approx(8 * night + night * 1.5)
+
+
+def test_team_inherits_dst_table():
+    pytest.importorskip("numpy")
+    from team import Team
+    start = at(2026, 10, 24, 12)
+    team = Team(["nuit", "continu"], [RATE, RATE], [start, start],
+                ["22:00-06:00/5", ""])
+    earned = team.tick(at(2026, 10, 25, 12))
+    assert earned[0] == pytest.approx(9 * RATE)
+    assert earned[1] == pytest.approx(25 * RATE)
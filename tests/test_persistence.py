@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+""" Sauvegarde : instantané + journal rejoué après un plantage, revenu hors ligne. """
+import time
+from datetime import datetime
+
+from engine import GameState
+from persistence import Store
+
+UPGRADES = [{"emoji": "a", "cost": 10, "interval": 5000,  "amount": 1},   # 0.2/s
+            {"emoji": "b", "cost": 50, "interval": 10000, "amount": 5}]   # 0.5/s
+START = time.mktime(datetime(2026, 5, 4, 9, 0).timetuple())
+
+
+def session(root, now):
+    clock = lambda: now[0]
+    store = Store(str(root), clock=clock)
+    game  = GameState(1, upgrades=UPGRADES, clock=clock)
+    return store, game
+
+
+def crashed_day(root, now):
+    """ Achats, instantané, encore un achat, puis plantage : pas de close(),
+    journal d'avant l'instantané jamais vidé, dernière ligne tronquée. """
+    store, game = session(root, now)
+    assert store.restore(game, START) == START
+    game.economy.add(100)
+    store.flush()
+    game.economy.buy(0)
+    game.economy.buy(1)
+    log = root / "journal.log"
+    stale = log.read_text(encoding="utf-8")
+    store.snapshot()
+    now[0] += 30
+    game.economy.buy(0)
+    game.economy.add(5)
+    store.flush()
+    store._log.close()   # descripteur rendu sans snapshot()
+    log.write_text(stale + log.read_text(encoding="utf-8")
+                   + '{"op": "buy", "idx": 1, "se', encoding="utf-8")
+    return game.summary()
+
+
+def test_restore_after_crash(tmp_path):
+    now = [1000.0]
+    saved = crashed_day(tmp_path, now)
+    # 100 - 10 - 50, + 30 s à 0.7/s avant le 3e achat, - 10 + 5
+    assert saved == {"cookies": 56, "counts": [2, 1]}
+    now[0] += 100   # overlay fermé 100 s
+    store, game = session(tmp_path, now)
+    assert store.restore(game, START + 3600) == START   # même jour : reprise
+    # journal rejoué une seule fois, puis 0.9 cookie/s pendant 100 s
+    assert game.summary() == {"cookies": 56 + 90, "counts": [2, 1]}
+    store.close()
+
+
+def test_restore_is_idempotent(tmp_path):
+    now = [1000.0]
+    crashed_day(tmp_path, now)
+    first = Store(str(tmp_path)).load()
+    assert Store(str(tmp_path)).load() == first
+    assert (first["cookies"], first["counts"]) == (56, [2, 1])
+
+
+def test_next_day_restarts_salary(tmp_path):
+    now = [1000.0]
+    crashed_day(tmp_path, now)
+    store, game = session(tmp_path, now)
+    tomorrow = START + 86400
+    assert store.restore(game, tomorrow) == tomorrow
+    assert game.summary()["counts"] == [2, 1]
+    store.close()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" Calculatrice par lots : CSV en flux, lignes courtes, sortie, cache. """
+import os
+import csv
+
+import pytest
+
+from pythagore import batch, csv_norms, stream_csv
+
+
+def rows(path, delim=","):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f, delimiter=delim))
+
+
+def test_short_rows_padded_before_norm(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("x,y,z\n6,8\n1,2,2\n", encoding="utf-8")
+    res = stream_csv(str(src))
+    assert rows(res["out"]) == [["x", "y", "z", "norm"],
+                                ["6", "8", "", "10.0"],
+                                ["1", "2", "2", "3.0"]]
+
+
+def test_rows_wider_than_first_pad_earlier_rows(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("3,4\n0,0,5\n", encoding="utf-8")
+    res = stream_csv(str(src), chunk=1)
+    assert rows(res["out"]) == [["3", "4", "", "5.0"], ["0", "0", "5", "5.0"]]
+    assert res["rows"] == 2
+
+
+def test_batch_error_names_original_line():
+    with pytest.raises(ValueError, match="ligne 5 "):
+        batch("# h\n3 4\n\n1 2 2\nabc")
+
+
+@pytest.mark.parametrize("delim", [",", ";"])
+def test_header_detected_and_delimiter_kept(tmp_path, delim):
+    src = tmp_path / "v.csv"
+    src.write_text(f"a{delim}b\n3{delim}4\n", encoding="utf-8")
+    res = stream_csv(str(src))
+    assert rows(res["out"], delim) == [["a", "b", "norm"], ["3", "4", "5.0"]]
+    assert (res["rows"], res["mean"]) == (1, 5.0)
+
+
+def test_numeric_first_line_is_data(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("3;4\n6;8\n", encoding="utf-8")
+    res = stream_csv(str(src))
+    assert rows(res["out"], ";") == [["3", "4", "5.0"], ["6", "8", "10.0"]]
+
+
+def test_existing_output_refused_unless_overwrite(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("3,4\n", encoding="utf-8")
+    out = tmp_path / "v_norms.csv"
+    out.write_text("à garder", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        csv_norms(str(src))
+    assert out.read_text(encoding="utf-8") == "à garder"
+    csv_norms(str(src), str(out), overwrite=True)
+    assert rows(out) == [["3", "4", "5.0"]]
+
+
+def test_output_never_replaces_input(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("3,4\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        csv_norms(str(src), str(src), overwrite=True)
+    assert src.read_text(encoding="utf-8") == "3,4\n"
+
+
+def test_cache_dropped_when_output_changes(tmp_path):
+    src = tmp_path / "v.csv"
+    src.write_text("3,4\n", encoding="utf-8")
+    out = tmp_path / "n.csv"
+    first = csv_norms(str(src), str(out))
+    assert csv_norms(str(src), str(out)) is first   # sortie intacte : cache
+    out.write_text("modifié\n", encoding="utf-8")
+    t = out.stat().st_mtime_ns + 10**9   # horloge de fichier grossière
+    os.utime(out, ns=(t, t))
+    with pytest.raises(FileExistsError):             # plus de cache : recalcul
+        csv_norms(str(src), str(out))
+    again = csv_norms(str(src), str(out), overwrite=True)
+    assert again is not first
+    assert rows(out) == [["3", "4", "5.0"]]
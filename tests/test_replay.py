@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+""" Rejeu : courses identiques avec ou sans NumPy, en-tête, rotation des sessions. """
+import json
+
+import pytest
+
+import engine
+from replay import (Recorder, ReplayMismatch, prune_sessions, replay,
+                    synthetic_day)
+
+
+def test_plan_race_ignores_numpy(monkeypatch):
+    with_np = [engine.plan_race(seed) for seed in range(50)]
+    monkeypatch.setattr(engine, "np", None)
+    assert [engine.plan_race(seed) for seed in range(50)] == with_np
+
+
+def test_plan_race_stops_at_finish():
+    frames, winner = engine.plan_race(7, count=6, finish=160)
+    assert max(frames[-1]) >= 160
+    assert all(max(row) < 160 for row in frames[:-1])
+    assert frames[-1][winner] >= 160
+
+
+def test_replay_round_trip(tmp_path):
+    path = str(tmp_path / "day.jsonl")
+    game = synthetic_day(path, hours=1)
+    replayed, n, _ = replay(path)
+    assert n > 0
+    assert replayed.summary() == game.summary()
+
+
+def test_replay_refuses_other_race_plan(tmp_path):
+    path = tmp_path / "day.jsonl"
+    synthetic_day(str(path), hours=1)
+    lines = path.read_text(encoding="utf-8").splitlines(True)
+    header = json.loads(lines[0])
+    header["race_plan"] = "numpy/0"
+    lines[0] = json.dumps(header) + "\n"
+    path.write_text("".join(lines), encoding="utf-8")
+    with pytest.raises(ReplayMismatch):
+        replay(str(path))
+
+
+def test_prune_sessions_keeps_latest(tmp_path):
+    names = [f"2026010{d}-120000.jsonl" for d in range(1, 8)]
+    for name in names:
+        (tmp_path / name).write_text("{}\n")
+    (tmp_path / "notes.txt").write_text("")
+    prune_sessions(str(tmp_path), keep=3)
+    left = sorted(p.name for p in tmp_path.iterdir())
+    assert left == names[-3:] + ["notes.txt"]
+
+
+def test_recorder_header_names_race_plan(tmp_path):
+    path = tmp_path / "s.jsonl"
+    rec = Recorder(engine.GameState(1), str(path))
+    rec.close()
+    header = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    assert header["race_plan"] == engine.RACE_PLAN
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tournoi de stratégies de pari, joué par des bots sur le moteur du jeu
+(engine.Blackjack, engine.HorseRace) sans affichage :
+- stratégies : mise fixe et Martingale au Blackjack, cheval au hasard,
+  favori et Martingale aux courses,
+- sessions seedées (une graine = une session reproductible) réparties
+  par paquets sur un ProcessPoolExecutor (tous les cœurs),
+- une ligne CSV par session écrite au fil des paquets terminés, puis
+  un résumé par stratégie (moyenne, quantiles, taux de ruine, rendement).
+`python tournament.py --sessions 10000 --rounds 200`
+`python tournament.py --bench` mesure le débit selon le nombre de process.
+"""
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import Economy, Blackjack, HorseRace, BJ_WIN, BJ_PUSH, odds_board
+
+TOURNEY_DIR   = "tournament"
+CHUNK         = 250    # sessions par tâche envoyée à un process
+BJ_STAND_ON   = 17     # les bots jouent comme le croupier
+STRATEGIES    = [
+    ("blackjack", "flat"),
+    ("blackjack", "martingale"),
+    ("horses",    "random"),
+    ("horses",    "favourite"),
+    ("horses",    "martingale"),
+]
+SESSION_FIELDS = ["game", "strategy", "seed", "rounds", "final", "peak",
+                  "trough", "wagered", "ruined"]
+
+
+class Bettor:
+    """ Taille de la mise : fixe, ou doublée après chaque perte. """
+
+    def __init__(self, base, martingale):
+        self.base       = base
+        self.martingale = martingale
+        self.bet        = base
+
+    def next(self, bankroll):
+        return min(self.bet, bankroll)
+
+    def outcome(self, won, push=False):
+        if not self.martingale or push:
+            return
+        self.bet = self.base if won else self.bet * 2
+
+
+def _blackjack_round(bj, amt):
+    bj.place_bet(amt)
+    while bj.in_round and bj.player.total < BJ_STAND_ON:
+        bj.hit()
+    if bj.in_round:
+        bj.stand()
+    return bj.result
+
+
+def play_session(game, strategy, seed, rounds, bankroll, base, odds=None):
+    """ Une session seedée ; renvoie une ligne SESSION_FIELDS. """
+    rng = random.Random(seed)
+    eco = Economy(cookies=bankroll, clock=lambda: 0.0)
+    bettor = Bettor(base, strategy == "martingale")
+    peak = trough = bankroll
+    wagered = played = 0
+    if game == "blackjack":
+        bj = Blackjack(eco, rng)
+    else:
+        race = HorseRace(eco, rng)
+        if odds:
+            race.set_odds(odds)
+        favourite = min(range(race.count), key=race.odds.__getitem__) + 1
+    for played in range(1, rounds + 1):
+        amt = bettor.next(eco.cookies)
+        if amt <= 0:
+            played -= 1
+            break
+        wagered += amt
+        if game == "blackjack":
+            res = _blackjack_round(bj, amt)
+            bettor.outcome(res == BJ_WIN, res == BJ_PUSH)
+        else:
+            pick = favourite if strategy == "favourite" else rng.randint(1, race.count)
+            race.start(pick, amt)
+            race.frame = len(race.frames) - 1   # pas d'animation : dernière image
+            bettor.outcome(race.step() == pick)
+        peak   = max(peak, eco.cookies)
+        trough = min(trough, eco.cookies)
+    return (game, strategy, seed, played, eco.cookies, peak, trough, wagered,
+            int(eco.cookies <= 0))
+
+
+def run_chunk(game, strategy, seeds, rounds, bankroll, base, odds=None):
+    """ Tâche d'un process : un paquet de sessions. """
+    return [play_session(game, strategy, s, rounds, bankroll, base, odds)
+            for s in seeds]
+
+
+def summarize(rows, bankroll):
+    finals  = sorted(r[4] for r in rows)
+    wagered = sum(r[7] for r in rows)
+    q = statistics.quantiles(finals, n=20) if len(finals) > 1 else finals * 19
+    return {
+        "sessions":   len(rows),
+        "mean_final": statistics.fmean(finals),
+        "stdev":      statistics.pstdev(finals),
+        "p5":         q[0],
+        "median":     statistics.median(finals),
+        "p95":        q[-1],
+        "ruin_rate":  sum(r[8] for r in rows) / len(rows),
+        "mean_rounds": statistics.fmean(r[3] for r in rows),
+        "roi":        (sum(finals) - bankroll * len(rows)) / wagered if wagered else 0.0,
+    }
+
+
+def run_tournament(sessions, rounds, bankroll, base, workers=None,
+                   out=TOURNEY_DIR, strategies=STRATEGIES, chunk=CHUNK):
+    """
+    Joue `sessions` sessions par stratégie ; écrit sessions.csv (au fil
+    de l'eau) et summary.csv dans `out`. Renvoie {stratégie: résumé}.
+    """
+    probs = odds_board()   # cotes équitables communes, calculées une fois
+    odds  = [1.0/p if p else 0.0 for p in probs.tolist()] if probs is not None else None
+    os.makedirs(out, exist_ok=True)
+    results = {s: [] for s in strategies}
+    with open(os.path.join(out, "sessions.csv"), "w", newline="",
+              encoding="utf-8") as f, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        w = csv.writer(f)
+        w.writerow(SESSION_FIELDS)
+        futures = {}
+        for game, strat in strategies:
+            for lo in range(0, sessions, chunk):
+                seeds = range(lo, min(lo + chunk, sessions))
+                fut = pool.submit(run_chunk, game, strat, seeds, rounds,
+                                  bankroll, base, odds)
+                futures[fut] = (game, strat)
+        for fut in as_completed(futures):
+            rows = fut.result()
+            w.writerows(rows)
+            results[futures[fut]].extend(rows)
+    summary = {s: summarize(rows, bankroll) for s, rows in results.items()}
+    with open(os.path.join(out, "summary.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        fields = list(next(iter(summary.values())))
+        w = csv.writer(f)
+        w.writerow(["game", "strategy"] + fields)
+        for (game, strat), s in summary.items():
+            w.writerow([game, strat] + [s[k] for k in fields])
+    return summary
+
+
+def benchmark(sessions=2000, rounds=100):
+    """ Débit (rounds/s) pour 1, 2, 4… process jusqu'au nombre de cœurs. """
+    import tempfile
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2**k for k in range(1, cores.bit_length())
+                                 if 2**k <= cores})
+    base_rate = None
+    for n in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            summary = run_tournament(sessions, rounds, 1000, 10, workers=n,
+                                     out=tmp)
+            dt = time.perf_counter() - t0
+        played = sum(s["mean_rounds"] * s["sessions"] for s in summary.values())
+        rate = played / dt
+        base_rate = base_rate or rate
+        print(f"{n:>3} process : {played:,.0f} rounds en {dt:.2f}s "
+              f"({rate:,.0f} rounds/s, ×{rate/base_rate:.2f})")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sessions", type=int, default=10_000)
+    ap.add_argument("--rounds",   type=int, default=200)
+    ap.add_argument("--bankroll", type=int, default=1000)
+    ap.add_argument("--bet",      type=int, default=10)
+    ap.add_argument("--workers",  type=int, default=None)
+    ap.add_argument("--out",      default=TOURNEY_DIR)
+    ap.add_argument("--bench",    action="store_true")
+    args = ap.parse_args(argv)
+    if args.bench:
+        benchmark()
+        return
+    t0 = time.perf_counter()
+    summary = run_tournament(args.sessions, args.rounds, args.bankroll,
+                             args.bet, args.workers, args.out)
+    dt = time.perf_counter() - t0
+    for (game, strat), s in summary.items():
+        print(f"{game:<9} {strat:<10} final moy. {s['mean_final']:>8.1f}  "
+              f"médiane {s['median']:>7.0f}  ruine {s['ruin_rate']:>6.1%}  "
+              f"rendement {s['roi']:+.3%}")
+    print(f"{len(summary) * args.sessions:,} sessions en {dt:.1f}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interface terminal (curses) pour les hôtes sans affichage, lancée par
+`python compteur.py --tui` :
+- compteur de salaire, cookie, inventaire, Blackjack et course de
+  chevaux en texte,
+- même moteur, même sauvegarde, même historique que l'overlay Tk
+  (engine.GameState, persistence.Store, replay.Recorder,
+  statsdb.StatsDB, payroll),
+- même ordonnanceur : scheduler.Scheduler tourne sur TermLoop, une
+  boucle getch() qui dort jusqu'à la prochaine échéance,
+- redessin incrémental : seules les cases dont le texte a changé sont
+  réécrites, curses n'envoie au terminal que la différence.
+Touches : espace clic · 1-9 acheter · +/- mise · b miser · h hit ·
+s stand · </> cheval · r courir · q quitter
+"""
+import os
+import math
+import time
+import heapq
+import curses
+import random
+import threading
+import traceback
+
+from scheduler import Scheduler
+from engine import GameState, HORSE_FINISH
+from persistence import Store, FLUSH_MS, SNAPSHOT_MS
+from statsdb import StatsDB
+from replay import Recorder
+from payroll import PaySchedule, WallClock, load_shifts
+
+TUI_UPDATE_MS = 100    # salaire (comme l'overlay)
+TUI_HORSE_MS  = 50
+TUI_ENC_MS    = 30000
+TUI_TRACK_W   = 40     # cases de piste
+TUI_BET_STEP  = 5
+TUI_SALARY_REC_MS = 60000   # salaire du jour enregistré dans stats.db
+
+
+class TermLoop:
+    """ after() / after_cancel() façon Tk, servis entre deux getch(). """
+
+    def __init__(self, scr):
+        self.scr    = scr
+        self._heap  = []
+        self._ids   = 0
+        self._alive = set()
+        self.running = True
+
+    def after(self, delay_ms, fn):
+        self._ids += 1
+        heapq.heappush(self._heap,
+                       (time.monotonic() + delay_ms / 1000.0, self._ids, fn))
+        self._alive.add(self._ids)
+        return self._ids
+
+    def after_cancel(self, after_id):
+        self._alive.discard(after_id)
+
+    def run(self, on_key, on_idle):
+        while self.running:
+            while self._heap and self._heap[0][1] not in self._alive:
+                heapq.heappop(self._heap)
+            wait = (self._heap[0][0] - time.monotonic()) if self._heap else 1.0
+            # arrondi au-dessus : pas de réveils à vide juste avant l'échéance
+            self.scr.timeout(max(0, math.ceil(wait * 1000)))
+            ch = self.scr.getch()
+            if ch != -1:
+                on_key(ch)
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, tid, fn = heapq.heappop(self._heap)
+                if tid in self._alive:
+                    self._alive.discard(tid)
+                    fn()
+            on_idle()
+
+
+class TerminalApp:
+    def __init__(self, scr, salary_per_hour, messages, horse_finish):
+        self.scr      = scr
+        self.messages = messages
+        self.game     = GameState(horse_finish=horse_finish)
+        self.economy  = self.game.economy
+        self.store    = Store()
+        self.start    = self.store.restore(self.game, time.time())
+        self.recorder = Recorder(self.game)
+        self.stats    = StatsDB()
+        self.stats.attach(self.game)
+        self.pay      = PaySchedule(load_shifts(salary_per_hour))
+        self.wall     = WallClock()
+        self.msg_rng  = random.Random(self.game.seed)
+        self.loop     = TermLoop(scr)
+        self.sched    = Scheduler(self.loop)
+        self._cells   = {}   # (ligne, colonne) → texte affiché
+        self._dirty   = False
+        self.bet      = 10
+        self.pick     = 1
+        self.status   = ""
+        self.enc      = ""
+        self._odds    = []   # cotes calculées par le thread, lues par _poll_odds
+        self._horse_job = None
+
+        self.game.blackjack.subscribe(self._on_blackjack)
+        self.game.race.subscribe(self._on_race)
+        s = self.sched
+        s.every(TUI_UPDATE_MS, self._draw_salary, group="ui", delay_ms=0)
+        s.every(TUI_UPDATE_MS, self.economy.settle, group="upgrades")
+        s.every(TUI_ENC_MS, self._encourage, group="ui", delay_ms=0)
+        s.every(FLUSH_MS, self.store.flush, group="persist")
+        s.every(FLUSH_MS, self.recorder.flush, group="persist")
+        s.every(SNAPSHOT_MS, self.store.snapshot, group="persist")
+        s.every(TUI_SALARY_REC_MS, self._record_salary, group="persist")
+        self._odds_job = s.every(250, self._poll_odds, group="horses")
+        threading.Thread(target=lambda: self._odds.append(
+            self.game.race.compute_odds()), daemon=True).start()
+
+    # -- cellules --
+    def put(self, y, x, text, attr=0, width=None):
+        """ Écrit `text` en (y, x) seulement s'il a changé. """
+        if width is not None:
+            text = text[:width].ljust(width)
+        if self._cells.get((y, x)) == (text, attr):
+            return
+        self._cells[(y, x)] = (text, attr)
+        self._dirty = True
+        try:
+            self.scr.addstr(y, x, text, attr)
+        except curses.error:
+            pass   # hors de l'écran (terminal trop petit)
+
+    def run(self):
+        curses.curs_set(0)
+        if curses.has_colors():
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_YELLOW, -1)
+        self.accent = curses.color_pair(1) | curses.A_BOLD
+        self._redraw()
+        try:
+            self.loop.run(self._on_key, self._flush)
+        finally:
+            self._record_salary()
+            self.stats.close()
+            self.store.close()
+            self.recorder.close()
+
+    def _flush(self):
+        # curses n'envoie au terminal que les cases modifiées
+        if self._dirty:
+            self._dirty = False
+            self.scr.refresh()
+
+    def _redraw(self):
+        self._cells.clear()
+        self.scr.erase()
+        self.put(0, 0, "SALARY", self.accent)
+        self.put(0, 40, "COOKIE", self.accent)
+        self.put(6, 0, "BLACKJACK", self.accent)
+        self.put(12, 0, "COURSE", self.accent)
+        self.put(21, 0, "espace clic · 1-9 acheter · +/- mise · b miser · "
+                        "h hit · s stand · </> cheval · r courir · q quitter",
+                 curses.A_DIM)
+        self._draw_cookies(); self._draw_inventory(); self._draw_bj()
+        self._draw_race(); self._draw_status(); self._draw_salary()
+
+    def _record_salary(self):
+        self.stats.record_day(self.pay, self.start, self.wall())
+
+    # -- vues --
+    def _draw_salary(self):
+        amt = self.pay.earned(self.start, self.wall())
+        self.put(2, 2, f"{amt:,.2f}", curses.A_BOLD, width=30)
+        self._draw_cookies()
+
+    def _draw_cookies(self):
+        self.put(2, 42, f"🍪 {self.economy.cookies}", width=20)
+
+    def _draw_inventory(self):
+        inv = "  ".join(f"{i+1}:{u.emoji} x{u.count} ({u.cost}🍪)"
+                        for i, u in enumerate(self.economy.upgrades))
+        self.put(4, 0, inv, width=78)
+
+    def _draw_bj(self):
+        bj = self.game.blackjack
+        self.put(7, 2, f"Dealer: {bj.dealer} ({bj.dealer.total})", width=60)
+        self.put(8, 2, f"Player: {bj.player} ({bj.player.total})", width=60)
+        self.put(9, 2, f"Mise : {self.bet} 🍪   {bj.result or ''}", width=60)
+
+    def _draw_race(self):
+        race = self.game.race
+        for i, pos in enumerate(race.positions):
+            cell = min(TUI_TRACK_W, pos * TUI_TRACK_W // race.finish)
+            mark = ">" if i + 1 == self.pick else " "
+            self.put(13 + i, 0, f"{mark}{i+1} |" + "·" * cell + "🐎"
+                     + " " * (TUI_TRACK_W - cell) + f"| ×{race.odds[i]:.1f}",
+                     width=60)
+
+    def _draw_status(self):
+        self.put(19, 0, self.status, self.accent, width=78)
+        self.put(20, 0, self.enc, width=78)
+
+    # -- événements moteur --
+    def _on_blackjack(self, event, *args):
+        self._draw_bj(); self._draw_cookies()
+
+    def _on_race(self, event, *args):
+        self._draw_race()
+        if event == "finish":
+            self.sched.cancel(self._horse_job)
+            num, gain = args
+            self.status = (f"Cheval {num} gagne ! +{gain}🍪" if gain else
+                           f"Cheval {num} gagne. –{self.game.race.stake}🍪")
+            self._draw_status(); self._draw_cookies()
+
+    def _poll_odds(self):
+        if self._odds:
+            self.sched.cancel(self._odds_job)
+            odds = self._odds.pop()
+            if odds is not None:
+                self.game.do("odds", odds)
+                self._draw_race()
+
+    def _encourage(self):
+        self.enc = self.msg_rng.choice(self.messages)
+        self._draw_status()
+
+    # -- touches --
+    def _on_key(self, ch):
+        if ch == curses.KEY_RESIZE:
+            self._redraw(); return
+        key = chr(ch) if 0 <= ch < 256 else ""
+        g, bj = self.game, self.game.blackjack
+        self.status = ""
+        try:
+            if key == "q":
+                self.loop.running = False
+            elif key == " ":
+                g.do("click")
+            elif key.isdigit() and 0 < int(key) <= len(self.economy.upgrades):
+                if not g.do("buy", int(key) - 1):
+                    self.status = "Pas assez de cookies"
+                self._draw_inventory()
+            elif key and key in "+-":
+                step = TUI_BET_STEP if key == "+" else -TUI_BET_STEP
+                self.bet = max(TUI_BET_STEP, self.bet + step)
+                self._draw_bj()
+            elif key == "b" and not bj.in_round:
+                g.do("bet", self.bet)
+            elif key == "h" and bj.in_round:
+                g.do("hit")
+            elif key == "s" and bj.in_round:
+                g.do("stand")
+            elif key and key in "<>":
+                n = g.race.count
+                self.pick = (self.pick - 1 + (1 if key == ">" else -1)) % n + 1
+                self._draw_race()
+            elif key == "r" and not g.race.running:
+                g.do("race", self.pick, self.bet)
+                self._horse_job = self.sched.every(
+                    TUI_HORSE_MS, lambda: g.do("step"), group="horses",
+                    delay_ms=0, name="_animate_horses")
+        except ValueError as e:
+            self.status = str(e)
+        self._draw_cookies(); self._draw_status()
+
+
+def run(salary_per_hour, messages, horse_finish=HORSE_FINISH):
+    """ Point d'entrée de `compteur.py --tui`. """
+    os.environ.setdefault("ESCDELAY", "25")
+    try:
+        curses.wrapper(lambda scr: TerminalApp(
+            scr, salary_per_hour, messages, horse_finish).run())
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Couche de rendu à contrôle de changement pour l'overlay :
+- garde la dernière valeur envoyée à chaque widget / élément de canvas
+  (clé = widget, élément, noms d'options),
+- n'appelle Tk que si la sortie formatée a changé (salaire à faible
+  taux horaire, cookies sans clic ni auto-clic, labels de Blackjack…),
+- compte les commandes envoyées et évitées (tk_rate(), par seconde).
+"""
+import time
+
+
+class ViewModel:
+    def __init__(self, clock=time.monotonic):
+        self.clock   = clock
+        self.sent    = 0   # commandes Tk envoyées
+        self.skipped = 0   # évitées (valeur inchangée)
+        self._last   = {}
+        self._mark   = (clock(), 0, 0)
+
+    def _changed(self, key, opts):
+        if self._last.get(key) == opts:
+            self.skipped += 1
+            return False
+        self._last[key] = opts
+        self.sent += 1
+        return True
+
+    def config(self, widget, **opts):
+        """ widget.config(**opts) si l'une des valeurs a changé. """
+        if self._changed((str(widget), None, tuple(opts)), opts):
+            widget.config(**opts)
+
+    def itemconfigure(self, canvas, item, **opts):
+        """ canvas.itemconfigure(item, **opts) si l'une des valeurs a changé. """
+        if self._changed((str(canvas), item, tuple(opts)), opts):
+            canvas.itemconfigure(item, **opts)
+
+    def forget(self, widget):
+        """ Oublie un widget détruit (fenêtre boutique refermée…). """
+        name = str(widget)
+        for key in [k for k in self._last if k[0] == name]:
+            del self._last[key]
+
+    def tk_rate(self):
+        """ (envoyées/s, évitées/s) depuis l'appel précédent. """
+        now = self.clock()
+        t0, sent0, skipped0 = self._mark
+        self._mark = (now, self.sent, self.skipped)
+        dt = (now - t0) or 1.0
+        return (self.sent - sent0) / dt, (self.skipped - skipped0) / dt